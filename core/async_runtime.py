@@ -0,0 +1,100 @@
+import asyncio
+import queue
+import threading
+from NOVA.core.logger import logger
+
+_END = object()
+
+class CancellableStream:
+    """
+    Sync iterator over an async generator running on the shared loop.
+    Lets thread-based code (NovaWorker) consume an LLM stream token by token
+    and close the underlying HTTP stream at once with cancel().
+    """
+    def __init__(self, runtime, agen):
+        self.runtime = runtime
+        self.agen = agen
+        self.cancelled = False
+        self._queue = queue.Queue()
+        self._task = None
+        self._started = threading.Event()
+
+    def start(self):
+        self.runtime.loop.call_soon_threadsafe(self._schedule)
+        self._started.wait()
+        return self
+
+    def _schedule(self):
+        self._task = self.runtime.loop.create_task(self._pump())
+        self._started.set()
+
+    async def _pump(self):
+        try:
+            async for chunk in self.agen:
+                self._queue.put(chunk)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self._queue.put(e)
+        finally:
+            # Closing the generator exits its `async with` and drops the connection
+            await self.agen.aclose()
+            self._queue.put(_END)
+
+    def cancel(self):
+        if self.cancelled:
+            return
+        self.cancelled = True
+        if self._task:
+            self.runtime.loop.call_soon_threadsafe(self._task.cancel)
+
+    def __iter__(self):
+        try:
+            while not self.cancelled:
+                item = self._queue.get()
+                if item is _END or self.cancelled:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        except GeneratorExit:
+            # Consumer stopped early (closed or dropped the iterator): stop generating too
+            self.cancel()
+            raise
+
+class AsyncRuntime:
+    """Background asyncio loop shared by the LLM layer."""
+    def __init__(self):
+        self.loop = None
+        self.thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self.loop is not None:
+                return
+            self.loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(target=self._run)
+            self.thread.daemon = True
+            self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        logger.debug("AsyncRuntime: event loop started.")
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Schedules a coroutine on the shared loop. Returns a concurrent.futures.Future."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Blocking helper for sync callers."""
+        return self.submit(coro).result(timeout)
+
+    def iterate(self, agen):
+        self.start()
+        return CancellableStream(self, agen).start()
+
+# Singleton instance
+async_runtime = AsyncRuntime()
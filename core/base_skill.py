@@ -1,3 +1,4 @@
+import re
 from typing import List
 from NOVA.core.types import SkillResponse
 
@@ -7,7 +8,20 @@ class BaseSkill:
         self.intents: List[str] = []
         self.description: str = "No description provided."
         self.slots: dict = {} # e.g. {"location": "City name"}
+        # Extractor per slot for local slot filling, when the slot name doesn't imply it (see slot_filler.SLOT_TYPES)
+        self.slot_types: dict = {}
         self.requires_approval: bool = False
+        # Sample utterances embedded next to the description for semantic routing
+        self.examples: List[str] = []
+        # True if execute() already returns finished speech (no LLM synthesis pass needed)
+        self.speakable_output: bool = False
+        # Regexes on the user's question that still require synthesis (e.g. r"\bumbrella\b")
+        self.synthesis_triggers: List[str] = []
+        # Fast-path utterance regexes: (pattern, intent); named groups become entities.
+        # Matched against lowercased text with fillers removed.
+        self.patterns: List[tuple] = []
+        # Words that must occur in the utterance before those patterns are tried
+        self.trigger_keywords: List[str] = []
     
     def execute(self, entities: dict) -> SkillResponse:
         """
@@ -16,3 +30,13 @@ class BaseSkill:
         :return: SkillResponse object.
         """
         raise NotImplementedError("Skill must implement execute method.")
+
+    def needs_synthesis(self, question: str) -> bool:
+        """
+        Whether the LLM router should rephrase this skill's output for the question.
+        :param question: The user's original utterance.
+        """
+        if not self.speakable_output:
+            return True
+        question = question.lower()
+        return any(re.search(t, question) for t in self.synthesis_triggers)
@@ -0,0 +1,192 @@
+import re
+import threading
+from collections import OrderedDict
+from NOVA.core.config_manager import config_manager
+from NOVA.core.logger import logger
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from chromadb.utils import embedding_functions
+except ImportError:
+    embedding_functions = None
+
+NEGATIONS = {"not", "no", "never", "nothing", "nobody", "hardly", "without", "cannot"}
+_WORD = re.compile(r"[a-z']+")
+
+def _normalize(text):
+    return " ".join(_WORD.findall(text.lower()))
+
+class BatchClassifier:
+    """
+    Labels many short texts in one pass (sentiment, tone, ...).
+    Each text goes through a result cache, then a local lexicon scorer, then an
+    embedding nearest-prototype classifier. Only texts still below the confidence
+    threshold are escalated to the LLM, all of them in one "classify" call.
+    """
+    def __init__(self, name, labels, default, lexicon=None, prototypes=None, flips=None,
+                 instruction=None, embed_fn=None):
+        self.name = name
+        self.labels = list(labels)
+        self.default = default
+        self.lexicon = lexicon or {} # word -> (label, weight)
+        self.prototypes = prototypes or {} # label -> example sentences
+        self.flips = flips or {} # label a negation turns it into (e.g. positive -> negative)
+        self.instruction = instruction or f"Label each text as one of: {', '.join(self.labels)}."
+        self.threshold = config_manager.get("classifier_confidence_threshold", 0.6)
+        self.escalate = config_manager.get("classifier_llm_escalation", True)
+        self.llm_batch_size = config_manager.get("classifier_llm_batch_size", 20)
+        self.cache_size = config_manager.get("classifier_cache_size", 2048)
+        self._cache = OrderedDict() # normalized text -> (label, confidence)
+        self._lock = threading.Lock()
+        self._embed_fn = embed_fn
+        self._centroids = None # label order follows self.labels
+        self._llm = None
+
+    def classify(self, text, escalate=None):
+        return self.classify_batch([text], escalate)[0]
+
+    def classify_batch(self, texts, escalate=None):
+        """Returns one label per text."""
+        return [label for label, _ in self.classify_scored(texts, escalate)]
+
+    def classify_scored(self, texts, escalate=None):
+        """
+        Returns (label, confidence) per text.
+        :param escalate: send low-confidence texts to the LLM (defaults to classifier_llm_escalation).
+        """
+        escalate = self.escalate if escalate is None else escalate
+        keys = [_normalize(t or "") for t in texts]
+        results = [None] * len(texts)
+        todo = {} # normalized text -> indices still to classify
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                if not key:
+                    results[i] = (self.default, 1.0)
+                    continue
+                hit = self._cache.get(key)
+                # A low-confidence entry is only final if we wouldn't escalate it now
+                if hit and (hit[1] >= self.threshold or not escalate):
+                    self._cache.move_to_end(key)
+                    results[i] = hit
+                else:
+                    todo.setdefault(key, []).append(i)
+
+        if todo:
+            unique = list(todo)
+            scored = {key: self._score_lexicon(key) for key in unique}
+            unsure = [key for key in unique if scored[key][1] < self.threshold]
+            if unsure:
+                scored.update(self._score_embedding(unsure, scored))
+                unsure = [key for key in unsure if scored[key][1] < self.threshold]
+            if unsure and escalate:
+                scored.update(self._score_llm(unsure))
+            with self._lock:
+                for key, result in scored.items():
+                    self._cache[key] = result
+                    self._cache.move_to_end(key)
+                    for i in todo[key]:
+                        results[i] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return results
+
+    def _score_lexicon(self, key):
+        # Weighted keyword hits; a negation up to 3 words back flips the label
+        scores = {}
+        words = key.split()
+        for i, word in enumerate(words):
+            entry = self.lexicon.get(word)
+            if not entry:
+                continue
+            label, weight = entry
+            window = words[max(0, i - 3):i]
+            if label in self.flips and any(w in NEGATIONS or w.endswith("n't") for w in window):
+                label = self.flips[label]
+            scores[label] = scores.get(label, 0.0) + weight
+        total = sum(scores.values())
+        if not total:
+            return (self.default, 0.5)
+        ranked = sorted(scores.values(), reverse=True) + [0.0]
+        best = max(scores, key=scores.get)
+        return (best, 0.5 + 0.5 * (ranked[0] - ranked[1]) / total)
+
+    def _embed(self, texts):
+        if self._embed_fn is None:
+            if embedding_functions is None:
+                return None
+            self._embed_fn = embedding_functions.DefaultEmbeddingFunction()
+        vecs = np.asarray(self._embed_fn(list(texts)), dtype=np.float32)
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vecs / norms
+
+    def _score_embedding(self, keys, scored):
+        # Nearest label centroid; replaces the lexicon result only when more confident
+        if np is None or not self.prototypes:
+            return {}
+        try:
+            if self._centroids is None:
+                rows = []
+                for label in self.labels:
+                    vecs = self._embed(self.prototypes.get(label) or [label])
+                    if vecs is None:
+                        return {}
+                    centroid = vecs.mean(axis=0)
+                    rows.append(centroid / (np.linalg.norm(centroid) or 1))
+                self._centroids = np.vstack(rows)
+            vecs = self._embed(keys)
+            if vecs is None:
+                return {}
+        except Exception as e:
+            logger.debug(f"Classifier[{self.name}]: embeddings unavailable ({e})")
+            self.prototypes = {}
+            return {}
+        sims = vecs @ self._centroids.T
+        out = {}
+        for key, row in zip(keys, sims):
+            order = np.argsort(row)[::-1]
+            margin = float(row[order[0]] - row[order[1]]) if len(order) > 1 else 1.0
+            result = (self.labels[int(order[0])], min(1.0, 0.5 + 2 * margin))
+            if result[1] > scored[key][1]:
+                out[key] = result
+        return out
+
+    def _schema(self, count):
+        return {
+            "type": "object",
+            "properties": {
+                "labels": {"type": "array", "items": {"type": "string", "enum": self.labels},
+                           "minItems": count}
+            },
+            "required": ["labels"],
+            "additionalProperties": False
+        }
+
+    def _score_llm(self, keys):
+        # One structured call per llm_batch_size texts; on any failure the local labels stand
+        if self._llm is None:
+            from NOVA.core.llm import get_llm_handler
+            self._llm = get_llm_handler()
+        out = {}
+        for start in range(0, len(keys), self.llm_batch_size):
+            chunk = keys[start:start + self.llm_batch_size]
+            numbered = "\n".join(f"{i + 1}. {text}" for i, text in enumerate(chunk))
+            prompt = (f"{self.instruction}\nReturn JSON: {{\"labels\": [one label per text, in order]}}\n"
+                      f"Texts:\n{numbered}")
+            try:
+                value = self._llm.generate_json(prompt, self._schema(len(chunk)), task="classify",
+                                                max_tokens=8 * len(chunk) + 16)
+            except Exception as e:
+                logger.debug(f"Classifier[{self.name}]: LLM escalation skipped ({e})")
+                continue
+            out.update((key, (label, 1.0)) for key, label in zip(chunk, value["labels"]))
+        return out
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
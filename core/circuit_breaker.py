@@ -0,0 +1,110 @@
+import threading
+import time
+from NOVA.core.config_manager import config_manager
+from NOVA.core.logger import logger
+
+class CircuitOpenError(Exception):
+    """The backend's breaker refused the request (open, or its half-open probe is taken)."""
+
+class CircuitBreaker:
+    """
+    Per-backend breaker.
+    closed: traffic flows. open: callers skip the backend until the cooldown ends.
+    half_open: a single probe request is let through; success closes, failure re-opens.
+    Timeouts and connection errors open it at once; other errors and latency SLO
+    breaches open it after failure_threshold in a row.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.failure_threshold = config_manager.get("llm_breaker_failure_threshold", 3)
+        self.cooldown = config_manager.get("llm_breaker_cooldown", 30)
+        self.latency_slo = config_manager.get("llm_latency_slo", 8) # seconds to first token
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self._probe_started = None
+        self.trips = 0
+
+    def available(self):
+        # Whether a request could go to this backend now; unlike allow() it claims nothing
+        with self._lock:
+            if self.state == "closed":
+                return True
+            now = time.monotonic()
+            if self.state == "open":
+                return now - self.opened_at >= self.cooldown
+            return self._probe_started is None or now - self._probe_started >= self.cooldown
+
+    def allow(self):
+        # True when a request may be sent to this backend now (claims the probe when half-open).
+        # The caller must then report success/failure, or release() if nothing was sent.
+        with self._lock:
+            if self.state == "closed":
+                return True
+            now = time.monotonic()
+            if self.state == "open" and now - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+                self._probe_started = None
+            if self.state == "half_open":
+                # One probe at a time; a probe that never reported back expires after the cooldown
+                if self._probe_started is None or now - self._probe_started >= self.cooldown:
+                    self._probe_started = now
+                    logger.info(f"Circuit[{self.name}]: half-open, probing")
+                    return True
+            return False
+
+    def release(self):
+        # Hands back a claimed probe whose request ended without an outcome (e.g. cancelled)
+        with self._lock:
+            if self.state == "half_open":
+                self._probe_started = None
+
+    def is_open(self):
+        with self._lock:
+            return self.state != "closed"
+
+    def record_success(self, latency=None):
+        if latency is not None and self.latency_slo and latency > self.latency_slo:
+            self.record_failure(f"slow ({latency:.1f}s > {self.latency_slo}s SLO)")
+            return
+        with self._lock:
+            if self.state != "closed":
+                logger.info(f"Circuit[{self.name}]: closed")
+            self.state = "closed"
+            self.failures = 0
+            self._probe_started = None
+
+    def record_failure(self, reason="error", hard=False):
+        with self._lock:
+            self.failures += 1
+            if self.state == "open":
+                return
+            if hard or self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._probe_started = None
+                self.trips += 1
+                logger.warning(f"Circuit[{self.name}]: open for {self.cooldown}s after {reason}")
+
+    def snapshot(self):
+        with self._lock:
+            return {"state": self.state, "failures": self.failures, "trips": self.trips}
+
+class CircuitBreakers:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.breakers = {}
+
+    def get(self, backend):
+        with self._lock:
+            if backend not in self.breakers:
+                self.breakers[backend] = CircuitBreaker(backend)
+            return self.breakers[backend]
+
+    def snapshot(self):
+        with self._lock:
+            return {name: b.snapshot() for name, b in self.breakers.items()}
+
+# Singleton instance
+circuit_breakers = CircuitBreakers()
@@ -0,0 +1,77 @@
+import threading
+import requests
+from NOVA.core.config_manager import config_manager
+from NOVA.core.logger import logger
+
+class ConnectivityMonitor:
+    """
+    Tracks whether the machine can reach the internet.
+    A background thread probes on an interval and caches the result, so callers
+    read a flag instead of paying for an HTTP round trip on every LLM call.
+    """
+    def __init__(self, probe_url=None, interval=None, offline_interval=None, timeout=2):
+        self.probe_url = probe_url or config_manager.get("connectivity_probe_url", "https://www.google.com")
+        # Seconds between probes while online / while offline (retry sooner to recover fast)
+        self.interval = interval or config_manager.get("connectivity_interval", 30)
+        self.offline_interval = offline_interval or config_manager.get("connectivity_offline_interval", 5)
+        self.timeout = timeout
+
+        # Optimistic until the first probe lands; a failed request flips it immediately.
+        self._online = True
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._probe_loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+
+    def is_online(self):
+        return self._online
+
+    def probe(self):
+        """Runs one blocking probe and updates the cached state."""
+        try:
+            requests.get(self.probe_url, timeout=self.timeout)
+            self._set_state(True)
+        except (requests.ConnectionError, requests.Timeout):
+            self._set_state(False)
+        return self._online
+
+    def report_success(self):
+        # A real request got through, no need to wait for the next probe
+        self._set_state(True)
+
+    def report_failure(self):
+        # A real request could not connect; go offline now and re-probe on the short interval
+        self._set_state(False)
+        self._wake.set()
+
+    def _set_state(self, online):
+        if online != self._online:
+            logger.info(f"Connectivity: {'ONLINE' if online else 'OFFLINE'}")
+        self._online = online
+
+    def _probe_loop(self):
+        while self.running:
+            try:
+                self.probe()
+            except Exception as e:
+                logger.error(f"Connectivity probe error: {e}")
+
+            wait = self.interval if self._online else self.offline_interval
+            self._wake.wait(wait)
+            self._wake.clear()
+
+# Singleton instance (shared by every LLMHandler)
+connectivity_monitor = ConnectivityMonitor()
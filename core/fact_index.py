@@ -0,0 +1,95 @@
+import re
+import threading
+from NOVA.core.logger import logger
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from chromadb.utils import embedding_functions
+except ImportError:
+    embedding_functions = None
+
+def estimate_tokens(text):
+    # ~4 characters per token; good enough for budgeting prompt context
+    return (len(text) + 3) // 4 if text else 0
+
+def _normalize(text):
+    return re.sub(r"[^\w\s]", "", text.lower()).strip()
+
+class FactIndex:
+    """
+    Embedding index over the user's profile facts.
+    Picks the facts most relevant to an utterance and spots near-duplicates.
+    Vectors are kept per fact text, so edits to the list only embed what's new.
+    """
+    def __init__(self, embed_fn=None):
+        self._embed_fn = embed_fn
+        self._vectors = {} # fact text -> L2-normalized float32 vector
+        self._lock = threading.Lock()
+        self._last_query = (None, None) # prompt is built twice per call (cache key + request)
+        self.enabled = np is not None
+
+    def _embed(self, texts):
+        if self._embed_fn is None:
+            if embedding_functions is None:
+                self.enabled = False
+                return None
+            self._embed_fn = embedding_functions.DefaultEmbeddingFunction()
+        vecs = np.asarray(self._embed_fn(list(texts)), dtype=np.float32)
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vecs / norms
+
+    def _matrix(self, facts):
+        # Embeds only the facts not seen before; returns one row per fact
+        with self._lock:
+            missing = [f for f in facts if f not in self._vectors]
+            if missing:
+                vecs = self._embed(missing)
+                if vecs is None:
+                    return None
+                self._vectors.update(zip(missing, vecs))
+            # Forget facts that were removed
+            for stale in set(self._vectors) - set(facts):
+                del self._vectors[stale]
+            return np.vstack([self._vectors[f] for f in facts])
+
+    def rank(self, query, facts):
+        """Returns facts ordered by similarity to query (None if embeddings are unavailable)."""
+        if not self.enabled or not facts or not query:
+            return None
+        try:
+            matrix = self._matrix(facts)
+            if matrix is None:
+                return None
+            if self._last_query[0] != query:
+                self._last_query = (query, self._embed([query])[0])
+            query_vec = self._last_query[1]
+            scores = matrix @ query_vec
+            return [facts[i] for i in np.argsort(-scores)]
+        except Exception as e:
+            logger.error(f"Fact Index: ranking failed ({e})")
+            return None
+
+    def find_duplicate(self, fact, facts, threshold):
+        """Returns the index of an existing fact that says the same thing, else None."""
+        norm = _normalize(fact)
+        for i, existing in enumerate(facts):
+            if _normalize(existing) == norm:
+                return i
+        if not self.enabled or not facts:
+            return None
+        try:
+            matrix = self._matrix(facts)
+            if matrix is None:
+                return None
+            scores = matrix @ self._embed([fact])[0]
+            best = int(np.argmax(scores))
+            if float(scores[best]) >= threshold:
+                return best
+        except Exception as e:
+            logger.error(f"Fact Index: duplicate check failed ({e})")
+        return None
@@ -0,0 +1,87 @@
+import json
+
+# JSON Schema type name -> Python types (bool is excluded from the numeric types)
+_TYPES = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "null": (type(None),)
+}
+
+def _is_type(value, name):
+    if name in ("integer", "number") and isinstance(value, bool):
+        return False
+    return isinstance(value, _TYPES.get(name, object))
+
+def validate(value, schema, path="$"):
+    """
+    Checks value against the subset of JSON Schema used for structured LLM output
+    (type, enum, properties, required, additionalProperties, items, minItems).
+    Returns a list of error strings; empty means valid.
+    """
+    errors = []
+    types = schema.get("type")
+    if types:
+        names = types if isinstance(types, list) else [types]
+        if not any(_is_type(value, t) for t in names):
+            return [f"{path}: expected {'/'.join(names)}, got {type(value).__name__}"]
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: {value!r} is not one of {schema['enum']}")
+
+    if isinstance(value, dict):
+        props = schema.get("properties", {})
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path}: missing '{key}'")
+        extra = schema.get("additionalProperties", True)
+        for key, item in value.items():
+            if key in props:
+                errors.extend(validate(item, props[key], f"{path}.{key}"))
+            elif extra is False:
+                errors.append(f"{path}: unexpected '{key}'")
+            elif isinstance(extra, dict):
+                errors.extend(validate(item, extra, f"{path}.{key}"))
+    elif isinstance(value, list):
+        if len(value) < schema.get("minItems", 0):
+            errors.append(f"{path}: expected at least {schema['minItems']} items")
+        if "items" in schema:
+            for i, item in enumerate(value):
+                errors.extend(validate(item, schema["items"], f"{path}[{i}]"))
+    return errors
+
+def parse(text, schema):
+    """Parses model output and validates it. Returns (value, errors)."""
+    try:
+        value = json.loads(text)
+    except (TypeError, ValueError) as e:
+        return None, [f"invalid JSON: {e}"]
+    return value, validate(value, schema)
+
+def strict_compatible(schema):
+    """
+    Whether OpenAI strict mode accepts the schema: every object lists all of its
+    properties in "required" and sets additionalProperties to false (optional
+    fields are expressed as nullable types instead).
+    """
+    if not isinstance(schema, dict):
+        return True
+    types = schema.get("type")
+    types = types if isinstance(types, list) else [types]
+    if "properties" in schema or "object" in types:
+        props = schema.get("properties", {})
+        if schema.get("additionalProperties") is not False or set(schema.get("required", [])) != set(props):
+            return False
+        if not all(strict_compatible(p) for p in props.values()):
+            return False
+    return strict_compatible(schema.get("items"))
+
+def slot_schema(slots):
+    # Object schema for a skill's slots ({"location": "City name"} -> string properties)
+    return {
+        "type": "object",
+        "properties": {k: {"type": "string", "description": v} for k, v in (slots or {}).items()},
+        "additionalProperties": False
+    }
@@ -0,0 +1,186 @@
+import json
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+class StreamingJSONParser:
+    """
+    Incremental parser for a single top-level JSON object arriving in chunks.
+    feed() returns events as soon as they can be known:
+      ("delta", key, text)  - decoded text of a streamed string field (e.g. "response")
+      ("field", key, value) - a top-level field whose value just closed
+      ("end", None, None)   - the closing brace of the object
+    Anything before the first '{' (e.g. a ```json fence) is ignored.
+    """
+    def __init__(self, stream_fields=("response",)):
+        self.stream_fields = set(stream_fields)
+        self.fields = {}
+        self.started = False
+        self.done = False
+        self.preamble = "" # text seen before the object (model ignored the JSON instruction)
+
+        self._raw = [] # raw chars of the current nested/scalar value
+        self._depth = 0
+        self._expect = "key" # key | colon | value | scalar | comma
+        self._key = None
+        self._in_string = False
+        self._string_role = None # key | value | nested
+        self._escape = False
+        self._unicode = None
+        self._high = None # high surrogate waiting for its low half (\ud83d\ude00)
+        self._chars = []
+
+    def feed(self, chunk):
+        events = []
+        delta = []
+        for c in chunk:
+            if self.done:
+                break
+            if not self.started:
+                if c == "{":
+                    self.started = True
+                    self._depth = 1
+                else:
+                    self.preamble += c
+                continue
+
+            if self._in_string:
+                decoded = self._string_char(c)
+                if self._string_role == "nested":
+                    self._raw.append(c)
+                if decoded is None:
+                    continue
+                if decoded is _CLOSE:
+                    self._in_string = False
+                    self._close_string(events, delta)
+                    continue
+                self._chars.append(decoded)
+                if self._string_role == "value" and self._key in self.stream_fields:
+                    delta.append(decoded)
+                continue
+
+            if self._depth > 1:
+                self._raw.append(c)
+                if c == '"':
+                    self._start_string("nested")
+                elif c in "{[":
+                    self._depth += 1
+                elif c in "}]":
+                    self._depth -= 1
+                    if self._depth == 1:
+                        self._emit_field(self._parse_raw(), events)
+                        self._expect = "comma"
+                continue
+
+            # depth == 1
+            if self._expect == "scalar":
+                if c in ",}":
+                    self._emit_field(self._parse_raw(), events)
+                    self._expect = "key"
+                    if c == "}":
+                        self._finish(events)
+                else:
+                    self._raw.append(c)
+            elif c.isspace():
+                continue
+            elif self._expect == "key":
+                if c == '"':
+                    self._start_string("key")
+                elif c == "}":
+                    self._finish(events)
+            elif self._expect == "colon":
+                if c == ":":
+                    self._expect = "value"
+            elif self._expect == "value":
+                if c == '"':
+                    self._start_string("value")
+                elif c in "{[":
+                    self._depth = 2
+                    self._raw = [c]
+                else:
+                    self._raw = [c]
+                    self._expect = "scalar"
+            elif self._expect == "comma":
+                if c == ",":
+                    self._expect = "key"
+                elif c == "}":
+                    self._finish(events)
+
+        if delta:
+            # Still inside a streamed string: hand over what we have so far
+            events.append(("delta", self._key, "".join(delta)))
+        return events
+
+    def _start_string(self, role):
+        self._in_string = True
+        self._string_role = role
+        self._escape = False
+        self._unicode = None
+        self._high = None
+        if role != "nested":
+            self._chars = []
+
+    def _string_char(self, c):
+        # Returns the decoded char, None (needs more input) or _CLOSE
+        if self._unicode is not None:
+            self._unicode += c
+            if len(self._unicode) < 4:
+                return None
+            try:
+                code = int(self._unicode, 16)
+            except ValueError:
+                code = None
+            self._unicode = None
+            high, self._high = self._high, None
+            if code is None:
+                return ""
+            if 0xD800 <= code < 0xDC00:
+                self._high = code
+                return None
+            if high is not None and 0xDC00 <= code < 0xE000:
+                return chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00))
+            return chr(code)
+        if self._escape:
+            self._escape = False
+            if c == "u":
+                self._unicode = ""
+                return None
+            return _ESCAPES.get(c, c)
+        if c == "\\":
+            self._escape = True
+            return None
+        if c == '"':
+            return _CLOSE
+        return c
+
+    def _close_string(self, events, delta):
+        if self._string_role == "nested":
+            return
+        text = "".join(self._chars)
+        if self._string_role == "key":
+            self._key = text
+            self._expect = "colon"
+        else:
+            self._emit_field(text, events, delta)
+            self._expect = "comma"
+
+    def _emit_field(self, value, events, delta=None):
+        if delta:
+            # Flush pending delta text before announcing the field is complete
+            events.append(("delta", self._key, "".join(delta)))
+            del delta[:]
+        self.fields[self._key] = value
+        events.append(("field", self._key, value))
+
+    def _parse_raw(self):
+        raw = "".join(self._raw).strip()
+        self._raw = []
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    def _finish(self, events):
+        self.done = True
+        events.append(("end", None, None))
+
+_CLOSE = object()
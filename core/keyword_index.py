@@ -0,0 +1,57 @@
+from collections import deque
+
+class KeywordIndex:
+    """
+    Aho-Corasick automaton over trigger keywords.
+    find() scans the text once and returns the values of every keyword that occurs in it,
+    so lookup cost depends on the text length and the hits, not on how many keywords exist.
+    """
+    def __init__(self):
+        self._goto = [{}] # state -> {char: next state}; state 0 is the root
+        self._fail = [0]
+        self._out = [set()] # state -> values of keywords ending here
+        self._built = True
+
+    def add(self, keyword, value):
+        state = 0
+        for ch in keyword.lower():
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(set())
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._out[state].add(value)
+        self._built = False
+
+    def build(self):
+        # Breadth-first failure links; each state also inherits the outputs of its fallback
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0) if self._goto[fallback].get(ch) != nxt else 0
+                self._out[nxt] |= self._out[self._fail[nxt]]
+        self._built = True
+
+    def find(self, text):
+        if not self._built:
+            self.build()
+        hits = set()
+        state = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                hits |= out[state]
+        return hits
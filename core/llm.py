@@ -1,4 +1,8 @@
 import os
+import json
+import time
+import asyncio
+import weakref
 import requests
 import openai
 from dotenv import load_dotenv
@@ -6,12 +10,29 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from NOVA.core.persona import persona_manager
+from NOVA.core.connectivity import connectivity_monitor
+from NOVA.core.llm_clients import llm_registry, httpx
+from NOVA.core.async_runtime import async_runtime
+from NOVA.core.llm_cache import response_cache
+from NOVA.core.llm_metrics import llm_metrics
+from NOVA.core.llm_tiers import task_tiers
+from NOVA.core.singleflight import SingleFlight, StreamFlights
+from NOVA.core.llm_scheduler import llm_scheduler, LLMShedError
+from NOVA.core.circuit_breaker import circuit_breakers, CircuitOpenError
+from NOVA.core import json_schema as schema_check
+from NOVA.core.config_manager import config_manager
+from NOVA.core.logger import logger
+from NOVA.core.types import ToolTurn
+
+# Strings the local path returns instead of raising; never cache these
+ERROR_PREFIXES = ("Local LLM Error", "Local LLM Failed", "NOVA: I am offline", "Error:", "OpenAI Error")
 
 class LLMHandler:
     def __init__(self):
         self.openai_key = os.getenv("OPENAI_API_KEY")
         self.local_llm_url = os.getenv("LOCAL_LLM_URL", "http://localhost:11434/api/generate")
         self.local_model = os.getenv("LOCAL_LLM_MODEL", "llama3") 
+        self.local_chat_url = os.getenv("LOCAL_LLM_CHAT_URL", self.local_llm_url.replace("/api/generate", "/api/chat"))
         
         if self.openai_key:
             openai.api_key = self.openai_key
@@ -19,37 +40,217 @@ class LLMHandler:
         else:
             print("LLM: No OpenAI API Key found. Defaulting to Offline mode.")
 
+        # Shared background probe, started once for all handlers
+        connectivity_monitor.start()
+        
+        # Streams handed out by stream(), so STOP can close them all
+        self._active_streams = weakref.WeakSet()
+        
+        # Opt-in: start OpenAI and Ollama together, first token wins
+        self.race_mode = config_manager.get("llm_race_mode", False)
+        
+        # Ollama prefix reuse: keep the model loaded and re-warm the persona prefix when it changes
+        self.local_keep_alive = config_manager.get("llm_local_keep_alive", "30m")
+        self.local_prewarm = config_manager.get("llm_local_prewarm", True)
+        self._warm_prefix = None
+        persona_manager.add_listener(self._on_prefix_changed)
+        
+        # Identical requests already in flight share one backend call
+        self.singleflight = config_manager.get("llm_singleflight", True)
+        self._inflight = SingleFlight()
+        self._inflight_streams = StreamFlights()
+        
+        # OpenAI timeouts shrink to a multiple of observed p95 (never above the tier timeout)
+        self.timeout_factor = config_manager.get("llm_timeout_p95_factor", 3)
+        self.timeout_floor = config_manager.get("llm_timeout_min", 3)
+        self.timeout_min_samples = config_manager.get("llm_timeout_min_samples", 10)
+        
+        # Structured output: OpenAI models that accept a strict JSON schema (others, like the default
+        # gpt-3.5-turbo, get json_object mode plus validation), and whether Ollama gets the schema
+        # itself in "format" (0.5+) or plain "json"
+        self.json_schema_models = tuple(config_manager.get("llm_json_schema_models",
+                                                           ["gpt-4o", "gpt-4.1", "gpt-5", "o3", "o4"]))
+        self.local_format_schema = config_manager.get("llm_local_format_schema", True)
+
     def is_online(self):
-        # checks internet
-        try:
-            requests.get("https://www.google.com", timeout=2)
-            return True
-        except requests.ConnectionError:
-            return False
+        # cached state from the connectivity monitor (no network call)
+        return connectivity_monitor.is_online()
 
-    def generate(self, prompt, model="gpt-3.5-turbo", max_tokens=150, system_prompt=None, stream=False):
+    def generate(self, prompt, model=None, max_tokens=None, system_prompt=None, stream=False,
+                 cache=True, cache_ttl=None, race=None, task="chat", priority=None, json_schema=None):
         # runs llm
-        if self.is_online() and self.openai_key:
-            return self._generate_openai(prompt, model, max_tokens, system_prompt, stream)
-        else:
-            return self._generate_local(prompt, system_prompt, stream)
+        # task picks the model tier (classify, route, plan, chat, synthesize); model/max_tokens override it
+        # cache=False opts out; cache_ttl overrides the default expiry (seconds)
+        # race=True/False overrides the llm_race_mode setting for this call
+        # priority (interactive/workflow/background) overrides the tier's scheduler class
+        # json_schema constrains the output to JSON matching that schema (see generate_json)
+        tier = self._schedule(task_tiers.resolve(task, model, max_tokens), priority)
+        tier["json_schema"] = json_schema
+        online = self._use_openai(tier)
+        if online and self._race_enabled(race):
+            # Racing needs concurrent streams, so it runs on the async path (with this tier and backend choice)
+            agen = self._astream(prompt, tier, online, system_prompt, cache, cache_ttl, race=True)
+            if stream:
+                return self._iterate(agen)
+            return async_runtime.run(self._ajoin(agen))
+
+        key = self._cache_key(online, tier, system_prompt, prompt)
+        if cache:
+            cached = response_cache.get(key)
+            if cached is not None:
+                return response_cache.replay(cached) if stream else cached
+
+        def call():
+            if online:
+                return self._generate_openai(prompt, tier, system_prompt, stream)
+            return self._generate_local(prompt, system_prompt, stream, tier)
+
+        if stream:
+            # Streaming callers that want coalescing use stream() (async fan-out)
+            result = call()
+            return self._record_stream(result, key, cache_ttl, json_schema) if cache else result
+        
+        result = self._inflight.do(key, call) if self.singleflight else call()
+        if cache:
+            self._cache_store(key, result, cache_ttl, json_schema)
+        return result
+
+    def generate_json(self, prompt, schema, task="plan", **kwargs):
+        """
+        generate() with output constrained to JSON (OpenAI response_format, Ollama format).
+        Returns the parsed value; raises ValueError if it doesn't match the schema.
+        """
+        text = self.generate(prompt, task=task, json_schema=schema, **kwargs)
+        value, errors = schema_check.parse(text, schema)
+        if errors:
+            logger.warning(f"LLM: structured output rejected ({'; '.join(errors[:3])})")
+            raise ValueError(f"model output didn't match the schema: {errors[0]}")
+        return value
+
+    def _schedule(self, tier, priority=None):
+        # Scheduler class and queue deadline for this call (a workflow context can only demote it)
+        tier["priority"] = llm_scheduler.effective_priority(priority or tier.get("priority"))
+        tier["deadline"] = llm_scheduler.deadline_for(tier["priority"])
+        return tier
+
+    def _use_openai(self, tier):
+        # Decided once per request. available() claims nothing: the half-open probe is only
+        # claimed (_claim_openai) when a request is actually sent, so a cache hit can't hold it.
+        return bool(self.is_online() and self.openai_key and tier["backend"] != "local"
+                    and circuit_breakers.get("openai").available())
+
+    def _claim_openai(self):
+        # Right before sending; raises CircuitOpenError if another request got the probe first
+        if not circuit_breakers.get("openai").allow():
+            raise CircuitOpenError("openai")
+
+    def _openai_timeout(self, tier, kind="ttft"):
+        # kind: "ttft" for streams (read timeout covers the wait for the first chunk), "latency" otherwise
+        p95 = llm_metrics.p95("openai", kind, self.timeout_min_samples, tier["task"])
+        if p95 is None:
+            return tier["timeout"]
+        return min(tier["timeout"], max(self.timeout_floor, p95 * self.timeout_factor))
+
+    def _openai_format(self, tier):
+        # response_format kwargs for a structured-output call (empty for free text)
+        schema = tier.get("json_schema")
+        if not schema:
+            return {}
+        if tier["model"].startswith(self.json_schema_models):
+            # strict=True makes OpenAI constrain decoding to the schema; without it the schema is only a hint
+            strict = schema_check.strict_compatible(schema)
+            if not strict:
+                logger.warning(f"LLM: {tier['task']} schema isn't strict-mode compatible; sent as a hint only")
+            return {"response_format": {"type": "json_schema",
+                                        "json_schema": {"name": tier["task"], "schema": schema, "strict": strict}}}
+        # Older models only guarantee syntactically valid JSON: the schema is enforced by validating
+        # afterwards (generate_json raises, the cache skips invalid output), not during decoding
+        return {"response_format": {"type": "json_object"}}
 
-    def _generate_openai(self, prompt, model="gpt-3.5-turbo", max_tokens=150, system_prompt=None, stream=False):
+    def _openai_failed(self, e):
+        # Bookkeeping for an OpenAI call that failed before producing output
+        llm_metrics.record_failure("openai")
+        hard = isinstance(e, (openai.APIConnectionError, openai.APITimeoutError))
+        if hard:
+            connectivity_monitor.report_failure()
+        circuit_breakers.get("openai").record_failure(type(e).__name__, hard=hard)
+
+    def _local_model(self, tier):
+        return tier.get("local_model") or self.local_model
+
+    def _system_prompt(self, system_prompt, tier, query=None):
+        # Only chat/synthesis pay for the persona + profile; internal calls get a lean prompt.
+        # query selects which profile facts are relevant enough to include.
+        return system_prompt or persona_manager.get_task_prompt(tier["task"], query)
+
+    def _cache_key(self, online, tier, system_prompt, prompt):
+        backend, model_name = ("openai", tier["model"]) if online else ("local", self._local_model(tier))
+        sys_msg = self._system_prompt(system_prompt, tier, prompt)
+        return response_cache.make_key(backend, model_name, sys_msg, prompt, tier["max_tokens"],
+                                       tier.get("json_schema"))
+
+    def _cache_store(self, key, text, ttl, json_schema=None):
+        if isinstance(text, str) and text and not text.startswith(ERROR_PREFIXES):
+            # Never cache structured output that doesn't validate
+            if json_schema and schema_check.parse(text, json_schema)[1]:
+                return
+            response_cache.set(key, text, ttl)
+
+    def _record_stream(self, gen, key, ttl, json_schema=None):
+        # Pass tokens through; cache the full text only if the stream completed
+        parts = []
+        for chunk in gen:
+            parts.append(chunk)
+            yield chunk
+        self._cache_store(key, "".join(parts).strip(), ttl, json_schema)
+
+    def cache_stats(self):
+        return response_cache.stats()
+
+    def backend_stats(self):
+        # Per-backend TTFT/latency percentiles, race win rates and circuit state
+        stats = llm_metrics.snapshot()
+        for name, circuit in circuit_breakers.snapshot().items():
+            stats.setdefault(name, {})["circuit"] = circuit
+        return stats
+
+    def scheduler_stats(self):
+        # Queue depth per backend/priority, shed counts and average queue wait
+        return llm_scheduler.stats()
+
+    def _race_enabled(self, race):
+        return self.race_mode if race is None else race
+
+    def _generate_openai(self, prompt, tier, system_prompt=None, stream=False):
         try:
-            client = openai.OpenAI(api_key=self.openai_key)
+            client = llm_registry.get_openai_client(self.openai_key)
             
             # Use provided prompt OR global persona
-            sys_msg = system_prompt if system_prompt else persona_manager.get_prompt()
+            sys_msg = self._system_prompt(system_prompt, tier, prompt)
             
-            response = client.chat.completions.create(
-                model=model, 
-                messages=[
-                    {"role": "system", "content": sys_msg},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
-                stream=stream
-            )
+            # Sync streams hand the slot back once the response starts; the async path holds it throughout
+            with llm_scheduler.slot("openai", tier["priority"], tier["deadline"]):
+                self._claim_openai()
+                t0 = time.monotonic()
+                response = client.chat.completions.create(
+                    model=tier["model"], 
+                    messages=[
+                        {"role": "system", "content": sys_msg},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=tier["max_tokens"],
+                    stream=stream,
+                    timeout=self._openai_timeout(tier, "ttft" if stream else "latency"),
+                    **self._openai_format(tier)
+                )
+                elapsed = time.monotonic() - t0
+            connectivity_monitor.report_success()
+            if stream:
+                circuit_breakers.get("openai").record_success(elapsed)
+            else:
+                # Full-response latency isn't held to the first-token SLO
+                llm_metrics.record_latency("openai", elapsed, tier["task"])
+                circuit_breakers.get("openai").record_success()
             
             if stream:
                 # Wrap the OpenAI stream to yield strings
@@ -61,43 +262,93 @@ class LLMHandler:
                 return generator()
             
             return response.choices[0].message.content.strip()
+        except LLMShedError:
+            raise # queue deadline passed: drop the request, don't retry elsewhere
+        except CircuitOpenError:
+            return self._generate_local(prompt, system_prompt, stream, tier)
         except Exception as e:
+            self._openai_failed(e)
             print(f"OpenAI Error: {e}. Falling back to local.")
-            return self._generate_local(prompt, system_prompt, stream)
+            return self._generate_local(prompt, system_prompt, stream, tier)
+
+    def _local_payload(self, prompt, sys_msg, stream, tier):
+        # System prompt goes in its own field so the model template puts it first:
+        # the persona prefix is then byte-identical across calls and Ollama reuses
+        # its KV cache instead of re-prefilling it. keep_alive keeps the model loaded.
+        payload = {
+            "model": self._local_model(tier),
+            "system": sys_msg,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.local_keep_alive,
+            "options": {"num_predict": tier["max_tokens"]}
+        }
+        schema = tier.get("json_schema")
+        if schema:
+            # Constrained decoding: Ollama only samples tokens that keep the output valid
+            payload["format"] = schema if self.local_format_schema else "json"
+        return payload
+
+    def _on_prefix_changed(self):
+        # Persona or profile changed: the cached prefix is stale, prefill the new one in the background
+        self._warm_prefix = None
+        if self.local_prewarm and not self.openai_key:
+            async_runtime.submit(self.awarm_local_prefix())
+
+    async def awarm_local_prefix(self):
+        """Prefills the persona prefix on Ollama so the next real turn skips it."""
+        sys_msg = persona_manager.get_prompt()
+        tier = task_tiers.resolve("chat")
+        prefix = (self._local_model(tier), sys_msg)
+        if prefix == self._warm_prefix:
+            return
+        payload = self._local_payload(".", sys_msg, False, tier)
+        payload["options"] = {"num_predict": 1}
+        try:
+            client = llm_registry.get_async_ollama_client()
+            async with llm_scheduler.aslot("local", "background", llm_scheduler.deadline_for("background")):
+                response = await client.post(self.local_llm_url, json=payload)
+            if response.status_code == 200:
+                self._warm_prefix = prefix
+                logger.debug("LLM: Local persona prefix warmed.")
+        except Exception as e:
+            logger.debug(f"LLM: Prefix warm-up skipped ({e})")
 
-    def _generate_local(self, prompt, system_prompt=None, stream=False):
+    def _generate_local(self, prompt, system_prompt=None, stream=False, tier=None):
         # runs local llm
-        print(f"LLM: Using Local Fallback ({self.local_model})...")
-        sys_msg = system_prompt if system_prompt else persona_manager.get_prompt()
-        
-        # Prepend system prompt to user prompt for local models (basic concatenation)
-        full_prompt = f"System: {sys_msg}\nUser: {prompt}"
+        tier = tier or self._schedule(task_tiers.resolve("chat"))
+        print(f"LLM: Using Local Fallback ({self._local_model(tier)})...")
+        sys_msg = self._system_prompt(system_prompt, tier, prompt)
         
         try:
-            payload = {
-                "model": self.local_model,
-                "prompt": full_prompt,
-                "stream": stream
-            }
+            # Pooled keep-alive session shared by all handlers
+            session = llm_registry.get_ollama_session()
+            payload = self._local_payload(prompt, sys_msg, stream, tier)
             # If streaming, we return a generator wrapper
             if stream:
                  # Note: requests.post with stream=True returns raw chunks
                  # Ollama returns valid JSON chunks per line
-                 response = requests.post(self.local_llm_url, json=payload, stream=True, timeout=10)
+                 with llm_scheduler.slot("local", tier["priority"], tier["deadline"]):
+                     response = session.post(self.local_llm_url, json=payload, stream=True, timeout=tier["timeout"])
                  def generator():
-                     if response.status_code == 200:
-                         for line in response.iter_lines():
-                             if line:
-                                 try:
-                                     json_chunk = requests.utils.json.loads(line)
-                                     yield json_chunk.get("response", "") 
-                                 except:
-                                     pass
-                     else:
-                        yield f"Error: {response.status_code}"
+                     try:
+                         if response.status_code == 200:
+                             for line in response.iter_lines():
+                                 if line:
+                                     try:
+                                         json_chunk = requests.utils.json.loads(line)
+                                         yield json_chunk.get("response", "") 
+                                     except:
+                                         pass
+                         else:
+                            yield f"Error: {response.status_code}"
+                     finally:
+                         # Hand the connection back to the pool
+                         response.close()
                  return generator()
 
-            response = requests.post(self.local_llm_url, json=payload, timeout=10)
+            with llm_scheduler.slot("local", tier["priority"], tier["deadline"]):
+                response = session.post(self.local_llm_url, json=payload, timeout=tier["timeout"])
             if response.status_code == 200:
                 data = response.json()
                 return data.get("response", "").strip()
@@ -105,5 +356,419 @@ class LLMHandler:
                 return f"Local LLM Error: {response.status_code}"
         except requests.ConnectionError:
             return "NOVA: I am offline and cannot reach the Local LLM (Ollama). Please ensure it is running."
+        except LLMShedError:
+            raise
         except Exception as e:
             return f"Local LLM Failed: {e}"
+
+    # --- Async API ---
+
+    async def agenerate(self, prompt, model=None, max_tokens=None, system_prompt=None,
+                        cache=True, cache_ttl=None, race=None, task="chat", priority=None, json_schema=None):
+        """Coroutine version of generate() (non-streaming)."""
+        return await self._ajoin(self.astream(prompt, model, max_tokens, system_prompt, cache, cache_ttl, race, task,
+                                              priority, json_schema))
+
+    async def _ajoin(self, agen):
+        chunks = []
+        async for chunk in agen:
+            chunks.append(chunk)
+        return "".join(chunks).strip()
+
+    async def astream(self, prompt, model=None, max_tokens=None, system_prompt=None,
+                      cache=True, cache_ttl=None, race=None, task="chat", priority=None, json_schema=None):
+        """
+        Async iterator of tokens. Cancelling the consuming task (or calling aclose())
+        closes the HTTP stream immediately instead of draining it.
+        """
+        tier = self._schedule(task_tiers.resolve(task, model, max_tokens), priority)
+        tier["json_schema"] = json_schema
+        agen = self._astream(prompt, tier, self._use_openai(tier), system_prompt, cache, cache_ttl, race)
+        try:
+            async for chunk in agen:
+                yield chunk
+        finally:
+            await agen.aclose()
+
+    async def _astream(self, prompt, tier, online, system_prompt, cache, cache_ttl, race):
+        # astream() body for an already resolved tier and backend choice
+        json_schema = tier.get("json_schema")
+        key = self._cache_key(online, tier, system_prompt, prompt)
+        if cache:
+            cached = response_cache.get(key)
+            if cached is not None:
+                for piece in response_cache.replay(cached):
+                    yield piece
+                return
+
+        racing = online and self._race_enabled(race)
+        def backend_stream():
+            if racing:
+                return self._astream_race(prompt, tier, system_prompt)
+            if online:
+                return self._astream_openai(prompt, tier, system_prompt)
+            return self._astream_local(prompt, system_prompt, tier=tier)
+
+        # Called only when the backend stream ran to completion (not cancelled)
+        on_complete = (lambda text: self._cache_store(key, text.strip(), cache_ttl, json_schema)) if cache else None
+        if self.singleflight:
+            agen = self._inflight_streams.stream((key, racing), backend_stream, on_complete)
+        else:
+            agen = self._collect(backend_stream(), on_complete)
+        try:
+            async for chunk in agen:
+                yield chunk
+        finally:
+            await agen.aclose()
+
+    async def _collect(self, agen, on_complete):
+        parts = []
+        try:
+            async for chunk in agen:
+                parts.append(chunk)
+                yield chunk
+        finally:
+            await agen.aclose()
+        if on_complete:
+            on_complete("".join(parts))
+
+    async def _astream_openai(self, prompt, tier, system_prompt, fallback=True):
+        sys_msg = self._system_prompt(system_prompt, tier, prompt)
+        breaker = circuit_breakers.get("openai")
+        started = False
+        claimed = False # holding the breaker until success/failure is reported
+        try:
+            client = llm_registry.get_async_openai_client(self.openai_key)
+            async with llm_scheduler.aslot("openai", tier["priority"], tier["deadline"]):
+                self._claim_openai()
+                claimed = True
+                t0 = time.monotonic() # TTFT excludes time spent queued
+                response = await client.chat.completions.create(
+                    model=tier["model"],
+                    messages=[
+                        {"role": "system", "content": sys_msg},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=tier["max_tokens"],
+                    stream=True,
+                    timeout=self._openai_timeout(tier),
+                    **self._openai_format(tier)
+                )
+                connectivity_monitor.report_success()
+                try:
+                    async for chunk in response:
+                        if not chunk.choices:
+                            continue
+                        content = chunk.choices[0].delta.content
+                        if content:
+                            if not started:
+                                ttft = time.monotonic() - t0
+                                llm_metrics.record_ttft("openai", ttft, tier["task"])
+                                breaker.record_success(ttft)
+                                claimed = False
+                            started = True
+                            yield content
+                finally:
+                    await response.close()
+                if claimed:
+                    # Completed without any text: still a working backend
+                    breaker.record_success()
+                    claimed = False
+        except Exception as e:
+            # Only fall back if nothing was streamed yet (otherwise the user hears two answers)
+            if started or isinstance(e, LLMShedError):
+                raise
+            refused = isinstance(e, CircuitOpenError) # never sent, nothing to report
+            if not refused:
+                claimed = False
+                self._openai_failed(e)
+            if not fallback:
+                raise
+            if not refused:
+                print(f"OpenAI Error: {e}. Falling back to local.")
+            async for chunk in self._astream_local(prompt, system_prompt, tier=tier):
+                yield chunk
+        finally:
+            if claimed:
+                # Cancelled (STOP, lost a race) before any outcome: free the probe
+                breaker.release()
+
+    async def _astream_local(self, prompt, system_prompt=None, raise_errors=False, tier=None):
+        # raise_errors=True is used when racing, so an error string can't "win"
+        tier = tier or self._schedule(task_tiers.resolve("chat"))
+        print(f"LLM: Using Local Fallback ({self._local_model(tier)})...")
+        sys_msg = self._system_prompt(system_prompt, tier, prompt)
+        payload = self._local_payload(prompt, sys_msg, True, tier)
+        started = False
+        try:
+            client = llm_registry.get_async_ollama_client()
+            async with llm_scheduler.aslot("local", tier["priority"], tier["deadline"]):
+                t0 = time.monotonic() # TTFT excludes time spent queued
+                async with client.stream("POST", self.local_llm_url, json=payload, timeout=tier["timeout"]) as response:
+                    if response.status_code != 200:
+                        raise RuntimeError(f"Error: {response.status_code}")
+                    async for line in response.aiter_lines():
+                        if line:
+                            try:
+                                token = json.loads(line).get("response", "")
+                            except ValueError:
+                                continue
+                            if token and not started:
+                                started = True
+                                llm_metrics.record_ttft("local", time.monotonic() - t0, tier["task"])
+                            yield token
+        except Exception as e:
+            if started or isinstance(e, LLMShedError):
+                raise
+            llm_metrics.record_failure("local")
+            if raise_errors:
+                raise
+            if isinstance(e, RuntimeError) and str(e).startswith("Error:"):
+                yield str(e)
+            elif httpx and isinstance(e, httpx.ConnectError):
+                yield "NOVA: I am offline and cannot reach the Local LLM (Ollama). Please ensure it is running."
+            else:
+                yield f"Local LLM Failed: {e}"
+
+    async def _astream_race(self, prompt, tier, system_prompt):
+        """
+        Starts OpenAI and Ollama at once. The first backend to produce a non-empty
+        token wins and keeps streaming; the other is cancelled (its HTTP stream closed).
+        """
+        contenders = {
+            "openai": self._astream_openai(prompt, tier, system_prompt, fallback=False),
+            "local": self._astream_local(prompt, system_prompt, raise_errors=True, tier=tier)
+        }
+        pending = {asyncio.ensure_future(agen.__anext__()): name for name, agen in contenders.items()}
+        winner = None
+        first_token = None
+
+        try:
+            while pending and winner is None:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        chunk = task.result()
+                    except (StopAsyncIteration, Exception) as e:
+                        logger.debug(f"LLM Race: {name} dropped out ({e!r})")
+                        continue
+                    if winner is None and chunk:
+                        winner, first_token = name, chunk
+                    elif winner is None:
+                        # Empty keep-alive token, keep waiting on this contender
+                        pending[asyncio.ensure_future(contenders[name].__anext__())] = name
+        finally:
+            # Cancel the loser(s) and close their streams
+            for task, name in pending.items():
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            for name, agen in contenders.items():
+                if name != winner:
+                    await agen.aclose()
+
+        llm_metrics.record_race(winner, contenders.keys())
+        if winner is None:
+            yield "NOVA: I am offline and cannot reach any LLM backend."
+            return
+
+        logger.info(f"LLM Race: {winner} won")
+        agen = contenders[winner]
+        try:
+            yield first_token
+            async for chunk in agen:
+                yield chunk
+        finally:
+            await agen.aclose()
+
+    # --- Native tool calling ---
+
+    def tool_turn(self, prompt, tools, model=None, max_tokens=None, system_prompt=None, task="route", priority=None):
+        """
+        One LLM call that either picks a tool or answers directly.
+        Returns a ToolTurn: tool_name is set when a tool was chosen, otherwise
+        iterator streams the chat text from that same response. A tool call that
+        follows some text sets tool_name once the iterator is exhausted.
+        """
+        tier = self._schedule(task_tiers.resolve(task, model, max_tokens), priority)
+        sys_msg = self._system_prompt(system_prompt, tier, prompt)
+        messages = [
+            {"role": "system", "content": sys_msg},
+            {"role": "user", "content": prompt}
+        ]
+        backend = "openai" if self._use_openai(tier) else "local"
+        return self._start_tool_turn(backend, messages, tools, tier)
+
+    def tool_result_stream(self, turn, result_text, max_tokens=None, task="synthesize", system_prompt=None):
+        """Sends the tool output back on the same conversation and streams the answer."""
+        if turn.backend == "openai":
+            call = {"id": turn.tool_call_id, "type": "function",
+                    "function": {"name": turn.tool_name, "arguments": json.dumps(turn.tool_args)}}
+            followup = [
+                {"role": "assistant", "content": None, "tool_calls": [call]},
+                {"role": "tool", "tool_call_id": turn.tool_call_id, "content": result_text}
+            ]
+        else:
+            call = {"function": {"name": turn.tool_name, "arguments": turn.tool_args}}
+            followup = [
+                {"role": "assistant", "content": "", "tool_calls": [call]},
+                {"role": "tool", "content": result_text}
+            ]
+        tier = self._schedule(task_tiers.resolve(task, max_tokens=max_tokens))
+        # The answer is spoken to the user: system prompt of the answering task, not the routing one
+        query = turn.messages[1]["content"] if len(turn.messages) > 1 else None
+        messages = [{"role": "system", "content": self._system_prompt(system_prompt, tier, query)}] + turn.messages[1:]
+        next_turn = self._start_tool_turn(turn.backend, messages + followup, None, tier)
+        return next_turn.iterator if next_turn.iterator is not None else iter(())
+
+    def _start_tool_turn(self, backend, messages, tools, tier):
+        # Blocks until the first event, which tells us tool call vs chat text
+        model = tier["model"]
+        handle = async_runtime.iterate(self._atool_events(backend, messages, tools, tier))
+        self._active_streams.add(handle)
+        events = iter(handle)
+        for event in events:
+            if event[0] == "tool":
+                _, name, args, call_id, used_backend = event
+                return ToolTurn(tool_name=name, tool_args=args, tool_call_id=call_id,
+                                backend=used_backend, model=model, messages=messages)
+            if event[1]:
+                turn = ToolTurn(backend=backend, model=model, messages=messages, stream=handle)
+                turn.iterator = self._tool_text(event[1], events, turn)
+                return turn
+        return ToolTurn(backend=backend, model=model, messages=messages, iterator=iter(()))
+
+    def _tool_text(self, first, events, turn):
+        yield first
+        for event in events:
+            if event[0] == "text":
+                yield event[1]
+            else:
+                # Tool call after a text preamble: recorded on the turn for the caller to run
+                _, turn.tool_name, turn.tool_args, turn.tool_call_id, turn.backend = event
+                logger.info(f"LLM: tool call '{turn.tool_name}' arrived after text")
+
+    async def _atool_events(self, backend, messages, tools, tier):
+        # Yields ("text", token) and finally ("tool", name, args, call_id, backend) if a tool was chosen
+        if backend == "openai":
+            started = False
+            try:
+                async for event in self._aopenai_tool_events(messages, tools, tier):
+                    started = True
+                    yield event
+                return
+            except Exception as e:
+                if started or isinstance(e, LLMShedError):
+                    raise
+                if not isinstance(e, CircuitOpenError):
+                    self._openai_failed(e)
+                    print(f"OpenAI Error: {e}. Falling back to local.")
+        async for event in self._alocal_tool_events(messages, tools, tier):
+            yield event
+
+    async def _aopenai_tool_events(self, messages, tools, tier):
+        client = llm_registry.get_async_openai_client(self.openai_key)
+        kwargs = {"model": tier["model"], "messages": messages, "max_tokens": tier["max_tokens"],
+                  "stream": True, "timeout": self._openai_timeout(tier)}
+        if tools:
+            kwargs["tools"] = tools
+        calls = {} # index -> partial tool call (arguments arrive in fragments)
+        async with llm_scheduler.aslot("openai", tier["priority"], tier["deadline"]):
+            self._claim_openai()
+            t0 = time.monotonic()
+            try:
+                response = await client.chat.completions.create(**kwargs)
+            except asyncio.CancelledError:
+                circuit_breakers.get("openai").release()
+                raise
+            connectivity_monitor.report_success()
+            circuit_breakers.get("openai").record_success(time.monotonic() - t0)
+            try:
+                async for chunk in response:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    if delta.content:
+                        yield ("text", delta.content)
+                    for tc in delta.tool_calls or []:
+                        call = calls.setdefault(tc.index, {"id": None, "name": "", "arguments": ""})
+                        if tc.id:
+                            call["id"] = tc.id
+                        if tc.function and tc.function.name:
+                            call["name"] += tc.function.name
+                        if tc.function and tc.function.arguments:
+                            call["arguments"] += tc.function.arguments
+            finally:
+                await response.close()
+
+        if calls:
+            call = calls[min(calls)]
+            try:
+                args = json.loads(call["arguments"] or "{}")
+            except ValueError:
+                args = {}
+            yield ("tool", call["name"], args, call["id"], "openai")
+
+    async def _alocal_tool_events(self, messages, tools, tier):
+        payload = {
+            "model": self._local_model(tier),
+            "messages": messages,
+            "stream": True,
+            "keep_alive": self.local_keep_alive,
+            "options": {"num_predict": tier["max_tokens"]}
+        }
+        if tools:
+            payload["tools"] = tools
+        client = llm_registry.get_async_ollama_client()
+        async with llm_scheduler.aslot("local", tier["priority"], tier["deadline"]):
+            async with client.stream("POST", self.local_chat_url, json=payload, timeout=tier["timeout"]) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    raise RuntimeError(f"Local LLM Error: {response.status_code} {body[:200]!r}")
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    try:
+                        message = json.loads(line).get("message", {})
+                    except ValueError:
+                        continue
+                    for tc in message.get("tool_calls") or []:
+                        fn = tc.get("function", {})
+                        yield ("tool", fn.get("name"), fn.get("arguments") or {}, None, "local")
+                        return
+                    if message.get("content"):
+                        yield ("text", message["content"])
+
+    def stream(self, prompt, model=None, max_tokens=None, system_prompt=None,
+               cache=True, cache_ttl=None, race=None, task="chat", priority=None, json_schema=None):
+        """
+        Sync, cancellable stream for thread-based callers.
+        Runs astream() on the shared event loop; cancel_streams() closes it mid-flight.
+        """
+        # Resolve the priority here: the caller's thread carries the workflow context, the loop doesn't
+        priority = llm_scheduler.effective_priority(priority or task_tiers.resolve(task).get("priority"))
+        return self._iterate(self.astream(prompt, model, max_tokens, system_prompt, cache, cache_ttl,
+                                          race, task, priority, json_schema))
+
+    def _iterate(self, agen):
+        # Sync, cancellable view of an async stream, registered for cancel_streams()
+        handle = async_runtime.iterate(agen)
+        self._active_streams.add(handle)
+        return handle
+
+    def cancel_streams(self):
+        # Closes every in-flight stream started via stream()
+        for handle in list(self._active_streams):
+            handle.cancel()
+
+# Process-wide handler (clients are pooled in llm_registry)
+_shared_handler = None
+
+def get_llm_handler():
+    global _shared_handler
+    if _shared_handler is None:
+        _shared_handler = LLMHandler()
+        # Local-only installs: prefill the persona prefix before the first turn
+        _shared_handler._on_prefix_changed()
+    return _shared_handler
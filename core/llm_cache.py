@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from NOVA.core.config_manager import config_manager
+from NOVA.core.logger import logger
+
+class ResponseCache:
+    """
+    Exact-match cache for LLM completions.
+    Tier 1 is an in-memory LRU; tier 2 is an optional SQLite file so answers
+    survive restarts. Every entry carries its own expiry timestamp.
+    """
+    def __init__(self, max_entries=None, default_ttl=None, db_path=None):
+        self.max_entries = max_entries or config_manager.get("llm_cache_max_entries", 512)
+        self.default_ttl = default_ttl or config_manager.get("llm_cache_ttl", 3600)
+        self.enabled = config_manager.get("llm_cache_enabled", True)
+        db_path = db_path or config_manager.get("llm_cache_path", None)
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict() # key -> (expires_at, text)
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, expires_at REAL, text TEXT)"
+            )
+            self._db.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+        except Exception as e:
+            logger.error(f"LLM Cache: disk tier disabled ({e})")
+            self._db = None
+
+    @staticmethod
+    def make_key(backend, model, system_prompt, prompt, max_tokens, extra=None):
+        # extra (e.g. an output schema) only enters the key when set, so plain keys stay stable
+        parts = [backend, model, system_prompt, prompt, max_tokens]
+        if extra is not None:
+            parts.append(extra)
+        raw = json.dumps(parts, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry:
+                expires_at, text = entry
+                if expires_at >= now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return text
+                del self._memory[key]
+
+            if self._db:
+                row = self._db.execute(
+                    "SELECT expires_at, text FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[0] >= now:
+                    self._remember(key, row[0], row[1]) # promote to memory tier
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[1]
+
+            self.misses += 1
+            return None
+
+    def set(self, key, text, ttl=None):
+        if not self.enabled or not text:
+            return
+        expires_at = time.time() + (ttl if ttl is not None else self.default_ttl)
+        with self._lock:
+            self._remember(key, expires_at, text)
+            if self._db:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO responses (key, expires_at, text) VALUES (?, ?, ?)",
+                        (key, expires_at, text)
+                    )
+                    self._db.commit()
+                except Exception as e:
+                    logger.error(f"LLM Cache: disk write failed ({e})")
+
+    def _remember(self, key, expires_at, text):
+        self._memory[key] = (expires_at, text)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "entries": len(self._memory)
+        }
+
+    @staticmethod
+    def replay(text):
+        """Yields cached text word by word so streaming consumers behave the same."""
+        for piece in re.findall(r"\S+\s*", text):
+            yield piece
+
+# Singleton instance
+response_cache = ResponseCache()
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+import openai
+from NOVA.core.config_manager import config_manager
+from NOVA.core.logger import logger
+
+try:
+    import httpx  # installed with openai>=1.0
+except ImportError:
+    httpx = None
+
+class LLMClientRegistry:
+    """
+    Process-wide holder for LLM backend connections.
+    Every LLMHandler borrows its OpenAI client and Ollama session from here, so
+    TCP/TLS connections stay alive and are reused across calls and instances.
+    """
+    def __init__(self):
+        self.pool_size = config_manager.get("llm_pool_size", 10)
+        self.openai_timeout = config_manager.get("llm_openai_timeout", 30)
+        self.local_timeout = config_manager.get("llm_local_timeout", 10)
+        self.keepalive_expiry = config_manager.get("llm_keepalive_expiry", 60)
+        # SDK retries stay off: the circuit breaker and local fallback are the retry policy,
+        # and a timed-out call has to reach the breaker after one attempt, not three
+        self.openai_max_retries = config_manager.get("llm_openai_max_retries", 0)
+
+        self._lock = threading.Lock()
+        self._openai_client = None
+        self._openai_key = None
+        self._ollama_session = None
+        # Async clients are bound to the event loop that created them
+        self._async_openai = {}
+        self._async_ollama = {}
+
+    def get_openai_client(self, api_key):
+        with self._lock:
+            if self._openai_client is None or api_key != self._openai_key:
+                if self._openai_client is not None:
+                    self._close_openai()
+                self._openai_client = self._build_openai_client(api_key)
+                self._openai_key = api_key
+            return self._openai_client
+
+    def get_ollama_session(self):
+        with self._lock:
+            if self._ollama_session is None:
+                self._ollama_session = self._build_ollama_session()
+            return self._ollama_session
+
+    def get_async_openai_client(self, api_key):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._async_openai.get(loop)
+            if entry is None or entry[0] != api_key:
+                kwargs = {"api_key": api_key, "timeout": self.openai_timeout, "max_retries": self.openai_max_retries}
+                if httpx:
+                    kwargs["http_client"] = httpx.AsyncClient(timeout=self.openai_timeout, limits=self._httpx_limits())
+                entry = (api_key, openai.AsyncOpenAI(**kwargs))
+                self._async_openai[loop] = entry
+            return entry[1]
+
+    def get_async_ollama_client(self):
+        if httpx is None:
+            raise RuntimeError("httpx is required for the async Ollama client.")
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_ollama.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(timeout=self.local_timeout, limits=self._httpx_limits())
+                self._async_ollama[loop] = client
+            return client
+
+    def _httpx_limits(self):
+        return httpx.Limits(
+            max_connections=self.pool_size,
+            max_keepalive_connections=self.pool_size,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    def _build_openai_client(self, api_key):
+        kwargs = {"api_key": api_key, "timeout": self.openai_timeout, "max_retries": self.openai_max_retries}
+        if httpx:
+            kwargs["http_client"] = httpx.Client(timeout=self.openai_timeout, limits=self._httpx_limits())
+        logger.debug(f"LLM Clients: OpenAI client created (pool={self.pool_size}, timeout={self.openai_timeout}s)")
+        return openai.OpenAI(**kwargs)
+
+    def _build_ollama_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        logger.debug(f"LLM Clients: Ollama session created (pool={self.pool_size}, timeout={self.local_timeout}s)")
+        return session
+
+    def _close_openai(self):
+        try:
+            self._openai_client.close()
+        except Exception:
+            pass
+        self._openai_client = None
+
+    def close(self):
+        with self._lock:
+            if self._openai_client is not None:
+                self._close_openai()
+            if self._ollama_session is not None:
+                self._ollama_session.close()
+                self._ollama_session = None
+
+# Singleton instance
+llm_registry = LLMClientRegistry()
@@ -0,0 +1,96 @@
+import threading
+from collections import deque
+
+class BackendStats:
+    """Rolling per-backend counters and latency samples (overall and per task tier)."""
+    def __init__(self, window=100):
+        self.window = window
+        self.requests = 0
+        self.failures = 0
+        self.races = 0
+        self.wins = 0
+        self.ttft = deque(maxlen=window) # seconds to first token
+        self.latency = deque(maxlen=window) # seconds for a full non-streamed response
+        # task -> {"ttft": samples, "latency": samples}; a 5-token classify and a 300-token plan
+        # take very different times, so timeouts derive from their own tier's samples
+        self.by_task = {}
+
+    def samples(self, kind, task=None):
+        if task is None:
+            return getattr(self, kind)
+        if task not in self.by_task:
+            self.by_task[task] = {"ttft": deque(maxlen=self.window), "latency": deque(maxlen=self.window)}
+        return self.by_task[task][kind]
+
+    @staticmethod
+    def percentile(samples, pct):
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def snapshot(self):
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "races": self.races,
+            "wins": self.wins,
+            "win_rate": (self.wins / self.races) if self.races else None,
+            "ttft_p50": self.percentile(self.ttft, 50),
+            "ttft_p95": self.percentile(self.ttft, 95),
+            "latency_p95": self.percentile(self.latency, 95)
+        }
+
+class LLMMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.backends = {}
+
+    def _get(self, backend):
+        if backend not in self.backends:
+            self.backends[backend] = BackendStats()
+        return self.backends[backend]
+
+    def record_ttft(self, backend, seconds, task=None):
+        self._record(backend, "ttft", seconds, task)
+
+    def record_latency(self, backend, seconds, task=None):
+        self._record(backend, "latency", seconds, task)
+
+    def _record(self, backend, kind, seconds, task):
+        with self._lock:
+            stats = self._get(backend)
+            stats.requests += 1
+            stats.samples(kind).append(seconds)
+            if task:
+                stats.samples(kind, task).append(seconds)
+
+    def p95(self, backend, kind="ttft", min_samples=1, task=None):
+        # kind: "ttft" or "latency"; task limits it to that tier's samples. None until there are enough
+        with self._lock:
+            stats = self.backends.get(backend)
+            samples = list(stats.samples(kind, task)) if stats else []
+        if len(samples) < min_samples:
+            return None
+        return BackendStats.percentile(samples, 95)
+
+    def record_failure(self, backend):
+        with self._lock:
+            stats = self._get(backend)
+            stats.requests += 1
+            stats.failures += 1
+
+    def record_race(self, winner, contenders):
+        with self._lock:
+            for backend in contenders:
+                self._get(backend).races += 1
+            if winner:
+                self._get(winner).wins += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stats.snapshot() for name, stats in self.backends.items()}
+
+# Singleton instance
+llm_metrics = LLMMetrics()
@@ -0,0 +1,213 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager, asynccontextmanager
+from NOVA.core.config_manager import config_manager
+from NOVA.core.logger import logger
+
+# Lower rank is served first
+PRIORITIES = {"interactive": 0, "workflow": 1, "background": 2}
+# Seconds a request may wait in the queue before it is shed (None = never)
+DEFAULT_DEADLINES = {"interactive": None, "workflow": 120, "background": 20}
+DEFAULT_LIMITS = {"openai": 8, "local": 2}
+
+class LLMShedError(RuntimeError):
+    """Raised when a queued LLM request passes its deadline before getting a slot."""
+
+class _Waiter:
+    def __init__(self, rank, deadline, loop=None):
+        self.rank = rank
+        self.deadline = deadline
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.abandoned = False
+        self.event = threading.Event()
+        self.loop = loop
+        self.future = loop.create_future() if loop else None
+
+    def wake(self):
+        if self.future is not None:
+            self.loop.call_soon_threadsafe(self._resolve)
+        else:
+            self.event.set()
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+class LLMScheduler:
+    """
+    Admission control in front of the LLM backends.
+    Each backend gets a bounded number of concurrent requests; waiters are served
+    by priority (interactive > workflow > background) and shed once their
+    deadline passes. Non-interactive work never takes the last llm_interactive_reserve
+    slots, so the live voice turn doesn't queue behind mood checks or summaries.
+    Works for both threads (slot) and the async runtime (aslot).
+    """
+    def __init__(self):
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(config_manager.get("llm_concurrency", {}) or {})
+        self.reserve = config_manager.get("llm_interactive_reserve", 1)
+        self.deadlines = dict(DEFAULT_DEADLINES)
+        self.deadlines.update(config_manager.get("llm_queue_deadlines", {}) or {})
+
+        self._lock = threading.Lock()
+        self._active = {} # backend -> running requests
+        self._queues = {} # backend -> heap of (rank, seq, waiter)
+        self._seq = itertools.count()
+        self._context = threading.local()
+        self.served = {p: 0 for p in PRIORITIES}
+        self.shed = {p: 0 for p in PRIORITIES}
+        self.wait_total = {p: 0.0 for p in PRIORITIES}
+
+    # --- Priority context (e.g. everything inside a workflow runs as "workflow") ---
+
+    @contextmanager
+    def priority(self, name):
+        previous = getattr(self._context, "priority", None)
+        self._context.priority = name
+        try:
+            yield
+        finally:
+            self._context.priority = previous
+
+    def effective_priority(self, priority):
+        # The surrounding context can only lower urgency, never raise it
+        ctx = getattr(self._context, "priority", None)
+        if priority not in PRIORITIES:
+            priority = "interactive"
+        if ctx in PRIORITIES and PRIORITIES[ctx] > PRIORITIES[priority]:
+            return ctx
+        return priority
+
+    def deadline_for(self, priority):
+        seconds = self.deadlines.get(priority)
+        return time.monotonic() + seconds if seconds else None
+
+    # --- Slots ---
+
+    def _capacity(self, backend, rank):
+        limit = self.limits.get(backend, 4)
+        if rank > 0:
+            limit = max(1, limit - self.reserve)
+        return limit
+
+    def _enqueue(self, backend, priority, deadline, loop=None):
+        # Returns None when a slot was taken right away, else the queued waiter
+        rank = PRIORITIES.get(priority, 0)
+        with self._lock:
+            queue = self._queues.setdefault(backend, [])
+            active = self._active.get(backend, 0)
+            ahead = any(not w.abandoned and w.rank <= rank for _, _, w in queue)
+            if not ahead and active < self._capacity(backend, rank):
+                self._active[backend] = active + 1
+                self.served[priority] += 1
+                return None
+            waiter = _Waiter(rank, deadline, loop)
+            heapq.heappush(queue, (rank, next(self._seq), waiter))
+            return waiter
+
+    def _settle(self, backend, waiter, priority):
+        with self._lock:
+            if waiter.granted:
+                self.served[priority] += 1
+                self.wait_total[priority] += time.monotonic() - waiter.enqueued
+                return
+            waiter.abandoned = True
+            self.shed[priority] += 1
+        logger.warning(f"LLM Scheduler: shed {priority} request to {backend} (queue deadline passed)")
+        raise LLMShedError(f"{backend} busy: {priority} request shed after queueing")
+
+    def _dispatch(self, backend):
+        # Caller holds the lock
+        queue = self._queues.get(backend, [])
+        now = time.monotonic()
+        while queue:
+            rank, _, waiter = queue[0]
+            if waiter.abandoned:
+                heapq.heappop(queue)
+                continue
+            if waiter.deadline is not None and waiter.deadline <= now:
+                heapq.heappop(queue)
+                waiter.wake() # settles as shed
+                continue
+            if self._active.get(backend, 0) >= self._capacity(backend, rank):
+                break
+            heapq.heappop(queue)
+            waiter.granted = True
+            self._active[backend] = self._active.get(backend, 0) + 1
+            waiter.wake()
+
+    def acquire(self, backend, priority="interactive", deadline=None):
+        waiter = self._enqueue(backend, priority, deadline)
+        if waiter is None:
+            return
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        waiter.event.wait(timeout)
+        self._settle(backend, waiter, priority)
+
+    async def aacquire(self, backend, priority="interactive", deadline=None):
+        waiter = self._enqueue(backend, priority, deadline, asyncio.get_running_loop())
+        if waiter is None:
+            return
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter.granted
+                waiter.abandoned = True
+            if granted:
+                self.release(backend)
+            raise
+        self._settle(backend, waiter, priority)
+
+    def release(self, backend):
+        with self._lock:
+            self._active[backend] = max(0, self._active.get(backend, 0) - 1)
+            self._dispatch(backend)
+
+    @contextmanager
+    def slot(self, backend, priority="interactive", deadline=None):
+        self.acquire(backend, priority, deadline)
+        try:
+            yield
+        finally:
+            self.release(backend)
+
+    @asynccontextmanager
+    async def aslot(self, backend, priority="interactive", deadline=None):
+        await self.aacquire(backend, priority, deadline)
+        try:
+            yield
+        finally:
+            self.release(backend)
+
+    def stats(self):
+        with self._lock:
+            backends = {}
+            for backend in set(self.limits) | set(self._active) | set(self._queues):
+                depth = {p: 0 for p in PRIORITIES}
+                for rank, _, waiter in self._queues.get(backend, []):
+                    if not waiter.abandoned:
+                        depth[next(p for p, r in PRIORITIES.items() if r == rank)] += 1
+                backends[backend] = {
+                    "active": self._active.get(backend, 0),
+                    "limit": self.limits.get(backend, 4),
+                    "queued": depth
+                }
+            priorities = {
+                p: {
+                    "served": self.served[p],
+                    "shed": self.shed[p],
+                    "avg_wait": (self.wait_total[p] / self.served[p]) if self.served[p] else 0.0
+                } for p in PRIORITIES
+            }
+        return {"backends": backends, "priorities": priorities}
+
+# Singleton instance (shared by every LLMHandler)
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,59 @@
+import os
+from NOVA.core.config_manager import config_manager
+from NOVA.core.logger import logger
+
+# Per task class: which model/backend serves it and how much it may spend.
+# backend: "auto" (OpenAI when online, else Ollama) or "local" (always Ollama).
+# local_model None means the handler's LOCAL_LLM_MODEL; classify/route use LOCAL_LLM_SMALL_MODEL when set.
+# priority is the scheduler class (see llm_scheduler.PRIORITIES).
+DEFAULT_TASK_TIERS = {
+    "classify":   {"model": "gpt-3.5-turbo", "local_model": None, "backend": "auto", "max_tokens": 5, "timeout": 5,
+                   "priority": "background"},
+    "route":      {"model": "gpt-3.5-turbo", "local_model": None, "backend": "auto", "max_tokens": 300, "timeout": 10,
+                   "priority": "interactive"},
+    "plan":       {"model": "gpt-3.5-turbo", "local_model": None, "backend": "auto", "max_tokens": 300, "timeout": 20,
+                   "priority": "interactive"},
+    "chat":       {"model": "gpt-3.5-turbo", "local_model": None, "backend": "auto", "max_tokens": 150, "timeout": 30,
+                   "priority": "interactive"},
+    "synthesize": {"model": "gpt-3.5-turbo", "local_model": None, "backend": "auto", "max_tokens": 150, "timeout": 20,
+                   "priority": "interactive"},
+    "summarize":  {"model": "gpt-3.5-turbo", "local_model": None, "backend": "auto", "max_tokens": 200, "timeout": 30,
+                   "priority": "background"}
+}
+SMALL_MODEL_TASKS = ("classify", "route", "summarize")
+
+class TaskTiers:
+    """
+    Maps a task class (classify, route, plan, chat, synthesize, summarize) to the model,
+    backend, token limit and timeout used for it. Overrides come from the
+    "llm_task_tiers" setting, e.g. {"classify": {"backend": "local", "local_model": "qwen2.5:0.5b"}}.
+    """
+    def __init__(self):
+        self.small_local_model = os.getenv("LOCAL_LLM_SMALL_MODEL")
+        self.reload()
+
+    def reload(self):
+        overrides = config_manager.get("llm_task_tiers", {}) or {}
+        self.tiers = {}
+        for task, defaults in DEFAULT_TASK_TIERS.items():
+            tier = dict(defaults)
+            tier.update(overrides.get(task, {}))
+            if not tier["local_model"] and task in SMALL_MODEL_TASKS:
+                tier["local_model"] = self.small_local_model
+            self.tiers[task] = tier
+        for task in overrides:
+            if task not in self.tiers:
+                logger.warning(f"LLM Tiers: unknown task class '{task}' in settings (ignored)")
+
+    def resolve(self, task, model=None, max_tokens=None):
+        """Returns the tier for task; explicit model/max_tokens from the caller win."""
+        tier = dict(self.tiers.get(task) or self.tiers["chat"])
+        tier["task"] = task if task in self.tiers else "chat"
+        if model:
+            tier["model"] = model
+        if max_tokens:
+            tier["max_tokens"] = max_tokens
+        return tier
+
+# Singleton instance
+task_tiers = TaskTiers()
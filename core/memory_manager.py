@@ -1,12 +1,152 @@
+import json
+import os
+import threading
+import time
+from NOVA.core.config_manager import config_manager
+from NOVA.core.logger import logger
+from NOVA.core.fact_index import estimate_tokens
+from NOVA.core.async_runtime import async_runtime
+from NOVA.core.llm import get_llm_handler, ERROR_PREFIXES
+
 class MemoryManager:
-    def __init__(self):
-        # Placeholder for ChromaDB or FAISS
-        self.memory = []
+    """
+    Rolling conversation memory.
+    Recent turns are kept verbatim up to a token window; older turns are folded
+    into a running summary in the background by the cheap "summarize" tier.
+    Both survive restarts via a small JSON file.
+    """
+    def __init__(self, path=None):
+        self.path = path or config_manager.get(
+            "memory_path", os.path.join(os.path.dirname(__file__), "../config/conversation_memory.json"))
+        self.window_tokens = config_manager.get("memory_window_tokens", 800)
+        self.summary_tokens = config_manager.get("memory_summary_tokens", 200)
+        self.max_pending = config_manager.get("memory_max_pending_turns", 20)
+
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock() # keeps snapshot + write in order across threads
+        self.turns = [] # [{"user", "assistant", "ts"}], oldest first
+        self.pending = [] # turns pushed out of the window, waiting to be summarized
+        self.summary = ""
+        self._summarizing = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self.turns = data.get("turns", [])
+            self.pending = data.get("pending", [])
+            self.summary = data.get("summary", "")
+        except Exception as e:
+            logger.error(f"Failed to load conversation memory: {e}")
+
+    def save(self):
+        with self._save_lock:
+            with self._lock:
+                data = {"summary": self.summary, "turns": list(self.turns), "pending": list(self.pending)}
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(self.path, 'w') as f:
+                    json.dump(data, f, indent=4)
+            except Exception as e:
+                logger.error(f"Failed to save conversation memory: {e}")
 
     def save_context(self, user_input, assistant_response):
-        self.memory.append({"user": user_input, "assistant": assistant_response})
+        if not user_input or not assistant_response:
+            return
+        with self._lock:
+            self.turns.append({"user": user_input, "assistant": assistant_response, "ts": time.time()})
+            # Keep the verbatim window bounded; overflow waits for summarization
+            while len(self.turns) > 1 and self._window_size() > self.window_tokens:
+                self.pending.append(self.turns.pop(0))
+            if len(self.pending) > self.max_pending:
+                # Summarizer can't keep up (e.g. offline): drop the oldest
+                del self.pending[:len(self.pending) - self.max_pending]
+            needs_summary = bool(self.pending) and not self._summarizing
+            if needs_summary:
+                self._summarizing = True
+        self.save()
+        if needs_summary:
+            async_runtime.submit(self._asummarize())
+
+    def _window_size(self):
+        return sum(estimate_tokens(self._format_turn(t)) for t in self.turns)
+
+    @staticmethod
+    def _format_turn(turn):
+        return f"User: {turn['user']}\nNOVA: {turn['assistant']}"
+
+    async def _asummarize(self):
+        ok = False
+        try:
+            with self._lock:
+                batch = list(self.pending)
+                previous = self.summary
+            transcript = "\n".join(self._format_turn(t) for t in batch)
+            prompt = f"""Existing summary:
+{previous or "(none)"}
+
+New conversation turns:
+{transcript}
+
+Update the summary to include the new turns. Keep names, facts, decisions and open questions.
+Stay under {self.summary_tokens} tokens."""
+            summary = await get_llm_handler().agenerate(prompt, task="summarize", cache=False)
+            if not summary or summary.startswith(ERROR_PREFIXES):
+                logger.debug("Memory: summarization skipped (LLM unavailable)")
+                return
+            with self._lock:
+                self.summary = summary
+                # By identity: save_context may have trimmed or extended pending meanwhile
+                done = {id(t) for t in batch}
+                self.pending = [t for t in self.pending if id(t) not in done]
+            ok = True
+            self.save()
+            logger.debug(f"Memory: folded {len(batch)} turns into summary")
+        except Exception as e:
+            logger.error(f"Memory summarization failed: {e}")
+        finally:
+            with self._lock:
+                # Turns that overflowed while we were summarizing (checked under the same lock save_context uses)
+                again = ok and bool(self.pending)
+                self._summarizing = again
+        if again:
+            await self._asummarize()
+
+    def build_context(self, budget_tokens=None, since=None):
+        """
+        Returns recent conversation as prompt text, newest turns first to fit
+        budget_tokens, preceded by the running summary when it also fits.
+        With since (a timestamp), only turns saved after it and no summary.
+        """
+        budget = budget_tokens or self.window_tokens
+        with self._lock:
+            turns = [t for t in self.turns if since is None or t.get("ts", 0) >= since]
+            summary = self.summary if since is None else ""
+        lines = []
+        for turn in reversed(turns):
+            text = self._format_turn(turn)
+            cost = estimate_tokens(text)
+            if cost > budget:
+                break
+            lines.insert(0, text)
+            budget -= cost
+        if summary and estimate_tokens(summary) <= budget:
+            lines.insert(0, f"Earlier: {summary}")
+        return "\n".join(lines)
 
     def retrieve_context(self):
-        if not self.memory:
-            return None
-        return self.memory[-1]
+        with self._lock:
+            return self.turns[-1] if self.turns else None
+
+    def clear(self):
+        with self._lock:
+            self.turns = []
+            self.pending = []
+            self.summary = ""
+        self.save()
+
+# Singleton instance
+memory_manager = MemoryManager()
@@ -1,42 +1,45 @@
-from NOVA.core.llm import LLMHandler
-import random
+from NOVA.core.batch_classifier import BatchClassifier
 
-class MoodDetector:
-    def __init__(self):
-        self.llm = LLMHandler()
+_POSITIVE = ["happy", "good", "great", "love", "awesome", "excellent", "fun", "glad", "thanks", "thank",
+             "nice", "amazing", "wonderful", "fantastic", "perfect", "cool", "excited", "enjoy", "enjoyed",
+             "like", "pleased", "brilliant", "beautiful", "yay", "relieved", "proud", "best"]
+_NEGATIVE = ["sad", "bad", "hate", "terrible", "awful", "angry", "upset", "annoyed", "annoying", "tired",
+             "worried", "stressed", "horrible", "worst", "frustrated", "frustrating", "disappointed", "sucks",
+             "broken", "useless", "lonely", "scared", "afraid", "sick", "hurt", "depressed", "miserable", "wrong"]
+
+SENTIMENT_LEXICON = {w: ("positive", 1.0) for w in _POSITIVE}
+SENTIMENT_LEXICON.update({w: ("negative", 1.0) for w in _NEGATIVE})
+
+SENTIMENT_PROTOTYPES = {
+    "positive": ["I'm really happy with this", "That's great news, thank you", "I love it, this is awesome"],
+    "neutral": ["What time is it", "Open the calendar", "Tell me about the weather tomorrow"],
+    "negative": ["I'm so frustrated right now", "This is terrible and I hate it", "I feel sad and tired"]
+}
+
+class MoodDetector(BatchClassifier):
+    """
+    Sentiment (positive / neutral / negative) for single utterances or whole
+    histories; see BatchClassifier for the lexicon -> embedding -> LLM cascade.
+    """
+    def __init__(self, embed_fn=None):
+        super().__init__(
+            "mood",
+            labels=["positive", "neutral", "negative"],
+            default="neutral",
+            lexicon=SENTIMENT_LEXICON,
+            prototypes=SENTIMENT_PROTOTYPES,
+            flips={"positive": "negative", "negative": "positive"},
+            instruction="Classify the sentiment of each text as 'positive', 'neutral', or 'negative'.",
+            embed_fn=embed_fn
+        )
 
     def analyze(self, text):
         """
         Analyze sentiment of the text.
         Returns: 'positive', 'neutral', 'negative'
         """
-        if not text:
-            return "neutral"
-            
-        # 1. Try LLM if available (and fast enough? might be slow for every input)
-        # To keep latency low, we might only check for strong words first or use a very fast LLM call.
-        # But per requirements: "Implement sentiment analysis ... using OpenAI GPT-3.5-turbo".
-        
-        try:
-            prompt = f"""Classify the sentiment of this text as 'positive', 'neutral', or 'negative'. Return LABEL ONLY.
-Text: "{text}"
-Label:"""
-            # Use low max_tokens to save cost/time
-            result = self.llm.generate(prompt, max_tokens=5, stream=False)
-            label = result.lower().strip()
-            
-            if "positive" in label: return "positive"
-            if "negative" in label: return "negative"
-            return "neutral"
-        except:
-            # Fallback (Simple Keywords)
-            return self._fallback_analyze(text)
+        return self.classify(text)
 
-    def _fallback_analyze(self, text):
-        text = text.lower()
-        pos_words = ["happy", "good", "great", "love", "awesome", "excellent", "fun"]
-        neg_words = ["sad", "bad", "hate", "terrible", "awful", "angry", "upset"]
-        
-        if any(w in text for w in pos_words): return "positive"
-        if any(w in text for w in neg_words): return "negative"
-        return "neutral"
+    def analyze_batch(self, texts, escalate=None):
+        """Sentiment for many texts at once (e.g. a conversation history or log)."""
+        return self.classify_batch(texts, escalate)
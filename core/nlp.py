@@ -1,4 +1,8 @@
 import re
+from NOVA.core.keyword_index import KeywordIndex
+
+# "(?P<name>" / "(?P=name)" in a pattern, so group names can be made unique per branch
+_NAMED_GROUP = re.compile(r"\(\?P([<=])(\w+)")
 
 class NLPHandler:
     def __init__(self):
@@ -32,12 +36,45 @@ class NLPHandler:
             (r"goodbye|bye|exit|shut down|terminate", "exit", {})
         ]
 
+        # Skill-declared patterns: owner -> (patterns, trigger keywords)
+        self.skill_patterns = {}
+
+        self.compile()
+
+    def register_patterns(self, owner, patterns, keywords=()):
+        """
+        Adds patterns declared by a skill (see BaseSkill.patterns / trigger_keywords).
+        They are only tried when one of the keywords occurs in the utterance
+        (always, if there are none). Call compile() once everything is registered.
+        """
+        normalized = [(p[0], p[1], p[2] if len(p) > 2 else None) for p in patterns]
+        self.skill_patterns[owner] = (normalized, [k.lower() for k in keywords])
+
+    def clear_registered(self):
+        self.skill_patterns = {}
+
+    def compile(self):
+        """
+        Builds the matchers from self.fillers, self.patterns and the registered skill patterns
+        (call again after changing them). Every pattern list becomes a single regex, so
+        classifying is one scan of the built-ins plus one per skill whose keywords occur.
+        """
+        self._filler_re = re.compile("|".join(f"(?:{f})" for f in self.fillers))
+        self._builtin = _compile_patterns(self.patterns)
+        self._skill_matchers = {}
+        self._keyword_index = KeywordIndex()
+        self._always = [] # owners without keywords
+        for order, (owner, (patterns, keywords)) in enumerate(self.skill_patterns.items()):
+            self._skill_matchers[owner] = (order, _compile_patterns(patterns))
+            for keyword in keywords:
+                self._keyword_index.add(keyword, owner)
+            if not keywords:
+                self._always.append(owner)
+        self._keyword_index.build()
+
     def clean_text(self, text):
         """Removes filler words and explicitly normalizes text."""
-        cleaned = text.lower()
-        for filler in self.fillers:
-            cleaned = re.sub(filler, "", cleaned)
-        return cleaned.strip()
+        return self._filler_re.sub("", text.lower()).strip()
 
     def process(self, text):
         """
@@ -45,21 +82,66 @@ class NLPHandler:
         """
         cleaned_text = self.clean_text(text)
         
-        for pattern, intent, entity_key in self.patterns:
-            match = re.search(pattern, cleaned_text)
-            if match:
-                entities = {}
-                if isinstance(entity_key, str) and entity_key:
-                    # Named group extraction if supported or flexible
-                    # For basic python re, we use named groups in pattern
-                    val = match.group(entity_key) if f"?P<{entity_key}>" in pattern else None
-                    if val:
-                        entities[entity_key] = val.strip()
-                    elif match.groups():
-                        # Fallback for simple capture groups
-                        entities["query"] = match.group(1).strip()
-                
-                return intent, entities, 1.0 # High confidence for exact regex match
+        # Skill patterns first (they are specific); only skills whose keywords occur are tried.
+        # They are anchored, so trailing punctuation (STT, removed fillers) is dropped for them.
+        skill_text = cleaned_text.rstrip(" .,!?")
+        owners = self._keyword_index.find(skill_text).union(self._always)
+        for owner in sorted(owners, key=lambda o: self._skill_matchers[o][0]):
+            result = _match(self._skill_matchers[owner][1], skill_text)
+            if result:
+                return result[0], result[1], 1.0
+        
+        result = _match(self._builtin, cleaned_text)
+        if result:
+            return result[0], result[1], 1.0 # High confidence for exact regex match
         
         # No match found
         return "unknown", {}, 0.0
+
+def _compile_patterns(patterns):
+    """
+    One regex for a pattern list. Each pattern is a branch tried in list order at the start
+    of the text, so the first listed pattern that matches anywhere wins.
+    Returns (regex, plan); the plan maps each branch to how its entities are read.
+    """
+    branches = []
+    for i, (pattern, intent, entity_key) in enumerate(patterns):
+        # Group names must be unique across branches: prefix them with the branch tag
+        renamed = _NAMED_GROUP.sub(lambda m: f"(?P{m.group(1)}p{i}_{m.group(2)}", pattern)
+        # Lookahead = re.search semantics for this pattern without consuming input
+        branches.append(f"(?=[\\s\\S]*?(?P<p{i}>{renamed}))")
+    matcher = re.compile("|".join(branches)) if branches else None
+
+    # Per branch: (intent, entity key, its named group, first capture group, all named groups)
+    # entity_key None (skill patterns) takes every named group as an entity
+    plan = {}
+    for i, (pattern, intent, entity_key) in enumerate(patterns):
+        key = entity_key if isinstance(entity_key, str) and entity_key else None
+        named = f"p{i}_{key}" if key and f"p{i}_{key}" in matcher.groupindex else None
+        first = matcher.groupindex[f"p{i}"] + 1 if key and re.compile(pattern).groups else None
+        groups = [(f"p{i}_{g}", g) for g in re.compile(pattern).groupindex] if entity_key is None else []
+        plan[f"p{i}"] = (intent, key, named, first, groups)
+    return matcher, plan
+
+def _match(compiled, text):
+    # Returns (intent, entities) or None
+    matcher, plan = compiled
+    match = matcher.match(text) if matcher else None
+    if not match:
+        return None
+    
+    # The branch's own tag group closes last, so it is lastgroup
+    intent, key, named, first, groups = plan[match.lastgroup]
+    entities = {}
+    if key:
+        val = match.group(named) if named else None
+        if val:
+            entities[key] = val.strip()
+        elif first:
+            # Fallback for simple capture groups
+            entities["query"] = (match.group(first) or "").strip()
+    for group, name in groups:
+        val = match.group(group)
+        if val and val.strip():
+            entities[name] = val.strip()
+    return intent, entities
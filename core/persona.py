@@ -1,5 +1,6 @@
 from NOVA.core.config_manager import config_manager
 from NOVA.core.profile import profile_manager
+from NOVA.core.logger import logger
 
 DEFAULT_SYSTEM_PROMPT = """You are NOVA (Neural Omni-Voice Assistant), a sophisticated, witty, and helpful AI.
 You are concise, professional, but have a touch of dry humor.
@@ -9,19 +10,50 @@ You respond in a way that is optimized for Voice Output (TTS):
 - Keep responses short (under 2 sentences) unless asked for detail.
 """
 
+# Lean system prompts for internal calls; they skip the persona and user profile
+DEFAULT_TASK_PROMPTS = {
+    "classify": "You are a text classifier. Reply with the label only.",
+    "plan": "You are a task planner. Output only the requested JSON.",
+    "summarize": "You compress conversation history into short factual notes. Output only the summary."
+}
+# Task classes that talk to the user and get the full persona + profile
+# (on chat turns the router's own "response" field is the spoken answer)
+PERSONA_TASKS = ("chat", "synthesize", "route")
+
 class PersonaManager:
     def __init__(self):
         # Load from config or set default
         self.system_prompt = config_manager.get("system_prompt", DEFAULT_SYSTEM_PROMPT)
+        self._listeners = [] # called when the prompt (or the profile inside it) changes
+        profile_manager.add_listener(self._notify)
 
-    def get_prompt(self):
-        # Dynamically inject profile context
-        context = profile_manager.get_context_string()
+    def get_prompt(self, query=None):
+        # Dynamically inject profile context (facts relevant to query when given)
+        context = profile_manager.get_context_string(query)
         return f"{self.system_prompt}\n\n{context}"
 
+    def get_task_prompt(self, task, query=None):
+        # Overridable via the "task_prompts" setting; unknown tasks get the persona
+        if task in PERSONA_TASKS:
+            return self.get_prompt(query)
+        prompts = config_manager.get("task_prompts", {}) or {}
+        return prompts.get(task) or DEFAULT_TASK_PROMPTS.get(task) or self.get_prompt(query)
+
     def set_prompt(self, new_prompt):
         self.system_prompt = new_prompt
         config_manager.set("system_prompt", new_prompt)
+        self._notify()
+
+    def add_listener(self, callback):
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def _notify(self):
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Persona listener failed: {e}")
 
     def reset_to_default(self):
         self.set_prompt(DEFAULT_SYSTEM_PROMPT)
@@ -1,6 +1,8 @@
 import json
 import os
 from NOVA.core.logger import logger
+from NOVA.core.config_manager import config_manager
+from NOVA.core.fact_index import FactIndex, estimate_tokens
 
 class ProfileManager:
     _instance = None
@@ -18,6 +20,11 @@ class ProfileManager:
             "preferences": {},
             "facts": []
         }
+        self._listeners = [] # called after every saved change
+        self.fact_index = FactIndex()
+        self.fact_top_k = config_manager.get("profile_fact_top_k", 5)
+        self.fact_budget_tokens = config_manager.get("profile_fact_budget_tokens", 150)
+        self.fact_merge_threshold = config_manager.get("profile_fact_merge_threshold", 0.9)
         self.load()
 
     def load(self):
@@ -36,6 +43,18 @@ class ProfileManager:
                 json.dump(self.data, f, indent=4)
         except Exception as e:
             logger.error(f"Failed to save user profile: {e}")
+        self._notify()
+
+    def add_listener(self, callback):
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def _notify(self):
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Profile listener failed: {e}")
 
     def get(self, key, default=None):
         return self.data.get(key, default)
@@ -49,11 +68,38 @@ class ProfileManager:
         self.save()
 
     def add_fact(self, fact):
-        if fact not in self.data["facts"]:
-            self.data["facts"].append(fact)
-            self.save()
+        facts = self.data["facts"]
+        dup = self.fact_index.find_duplicate(fact, facts, self.fact_merge_threshold)
+        if dup is None:
+            facts.append(fact)
+        elif facts[dup] != fact:
+            # Same fact reworded (or updated): keep the newer wording
+            logger.info(f"Profile: merged '{fact}' into '{facts[dup]}'")
+            facts[dup] = fact
+        else:
+            return
+        self.save()
+
+    def select_facts(self, query=None, top_k=None, budget_tokens=None):
+        """Top-k facts most relevant to query, within a token budget (newest first without a query)."""
+        facts = self.data.get("facts", [])
+        top_k = top_k or self.fact_top_k
+        budget = budget_tokens or self.fact_budget_tokens
+        if len(facts) <= top_k and sum(estimate_tokens(f) for f in facts) <= budget:
+            return list(facts)
+        ranked = self.fact_index.rank(query, facts) if query else None
+        if ranked is None:
+            ranked = list(reversed(facts))
+        selected = []
+        for fact in ranked[:top_k]:
+            cost = estimate_tokens(fact)
+            if cost > budget:
+                continue
+            selected.append(fact)
+            budget -= cost
+        return selected
 
-    def get_context_string(self):
+    def get_context_string(self, query=None):
         """Returns a string summary of the user for LLM context."""
         context = f"User Name: {self.data.get('name')}\n"
         
@@ -63,7 +109,7 @@ class ProfileManager:
             for k, v in prefs.items():
                 context += f"- {k}: {v}\n"
         
-        facts = self.data.get("facts", [])
+        facts = self.select_facts(query)
         if facts:
             context += "Facts about user:\n"
             for fact in facts:
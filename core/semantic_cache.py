@@ -0,0 +1,132 @@
+import re
+import threading
+import time
+from NOVA.core.config_manager import config_manager
+from NOVA.core.logger import logger
+from NOVA.core.llm import ERROR_PREFIXES
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from chromadb.utils import embedding_functions
+except ImportError:
+    embedding_functions = None
+
+# Utterances mentioning these are time-sensitive (never looked up or stored).
+# Only chat answers reach the cache; skill results are never stored.
+DEFAULT_VOLATILE_WORDS = [
+    "today", "tonight", "tomorrow", "yesterday", "now", "current", "latest",
+    "news", "time", "date", "weather", "score", "price"
+]
+
+class SemanticCache:
+    """
+    In-process embedding index of past (utterance, answer) pairs.
+    A new utterance whose cosine similarity to a stored one clears the threshold
+    reuses that answer instead of making an LLM round trip.
+    """
+    def __init__(self, embed_fn=None, threshold=None, ttl=None, max_entries=None):
+        self.threshold = threshold or config_manager.get("semantic_cache_threshold", 0.92)
+        self.ttl = ttl or config_manager.get("semantic_cache_ttl", 86400)
+        self.max_entries = max_entries or config_manager.get("semantic_cache_max_entries", 256)
+        volatile = config_manager.get("semantic_cache_volatile_words", DEFAULT_VOLATILE_WORDS)
+        self._volatile_re = re.compile(r"\b(" + "|".join(re.escape(w) for w in volatile) + r")\b", re.IGNORECASE)
+
+        self.enabled = config_manager.get("semantic_cache_enabled", True) and np is not None
+        self._embed_fn = embed_fn
+        self._lock = threading.Lock()
+        self._vectors = None # float32 matrix, one L2-normalized row per entry
+        self._entries = [] # [(utterance, answer, expires_at)]
+        self.hits = 0
+        self.misses = 0
+
+    def _embed(self, text):
+        if self._embed_fn is None:
+            if embedding_functions is None:
+                self.enabled = False
+                return None
+            self._embed_fn = embedding_functions.DefaultEmbeddingFunction()
+        vec = np.asarray(self._embed_fn([text])[0], dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def is_cacheable(self, text, context=None):
+        # context: conversation history the answer depends on. Follow-ups ("tell me more")
+        # mean something else in every conversation, so such turns never use the cache.
+        if not self.enabled or not text or context:
+            return False
+        return not self._volatile_re.search(text)
+
+    def lookup(self, text, context=None):
+        """Returns (answer, score) for the closest live entry above threshold, else None."""
+        if not self.is_cacheable(text, context) or not self._entries:
+            return None
+        try:
+            query = self._embed(text)
+            if query is None:
+                return None
+            with self._lock:
+                self._evict_expired()
+                if not self._entries:
+                    self.misses += 1
+                    return None
+                scores = self._vectors @ query
+                best = int(np.argmax(scores))
+                score = float(scores[best])
+                if score >= self.threshold:
+                    self.hits += 1
+                    return self._entries[best][1], score
+                self.misses += 1
+        except Exception as e:
+            logger.error(f"Semantic Cache lookup failed: {e}")
+        return None
+
+    def add(self, text, answer, context=None):
+        if not answer or answer.startswith(ERROR_PREFIXES) or not self.is_cacheable(text, context):
+            return
+        try:
+            vec = self._embed(text)
+            if vec is None:
+                return
+            with self._lock:
+                self._entries.append((text, answer, time.time() + self.ttl))
+                row = vec[np.newaxis, :]
+                self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])
+                if len(self._entries) > self.max_entries:
+                    # Oldest first
+                    drop = len(self._entries) - self.max_entries
+                    self._entries = self._entries[drop:]
+                    self._vectors = self._vectors[drop:]
+        except Exception as e:
+            logger.error(f"Semantic Cache add failed: {e}")
+
+    def remember_stream(self, text, iterator, context=None, cancelled=None):
+        """Wraps a token stream; stores the full answer once it finishes.
+
+        cancelled: callable telling whether the underlying LLM stream was stopped,
+        for iterators that wrap one (defaults to the iterator's own flag).
+        """
+        parts = []
+        for chunk in iterator:
+            parts.append(chunk)
+            yield chunk
+        if cancelled is None:
+            cancelled = lambda: getattr(iterator, "cancelled", False)
+        if cancelled():
+            return # partial answer (user pressed STOP)
+        self.add(text, "".join(parts).strip(), context)
+
+    def _evict_expired(self):
+        now = time.time()
+        keep = [i for i, entry in enumerate(self._entries) if entry[2] >= now]
+        if len(keep) != len(self._entries):
+            self._entries = [self._entries[i] for i in keep]
+            self._vectors = self._vectors[keep] if keep else None
+
+    def clear(self):
+        with self._lock:
+            self._entries = []
+            self._vectors = None
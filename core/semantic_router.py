@@ -1,59 +1,210 @@
+import hashlib
+import json
+import threading
 import chromadb
 from chromadb.utils import embedding_functions
-import os
+from NOVA.core.logger import logger
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 class SemanticRouter:
-    def __init__(self, persistence_path="./chroma_db"):
+    """
+    Maps an utterance to the closest registered intent.
+    Intent vectors (descriptions + examples) live in an in-memory float32 matrix, so a
+    lookup is one embedding plus one matrix-vector product; ChromaDB only persists them.
+    Without numpy it falls back to querying the Chroma collection.
+    Each document carries a hash of its intent's content and the embedding model,
+    so registering an unchanged intent again costs nothing.
+    """
+    def __init__(self, persistence_path="./chroma_db", embed_fn=None, model_name=None):
         self.client = chromadb.PersistentClient(path=persistence_path)
         # Default embedding function (all-MiniLM-L6-v2) is used if not specified
         self.collection = self.client.get_or_create_collection(name="intent_registry")
-        
+        self._embed_fn = embed_fn
+        # Part of the content hash: switching models re-embeds everything
+        self.model_name = model_name or (getattr(embed_fn, "__name__", type(embed_fn).__name__)
+                                         if embed_fn else "all-MiniLM-L6-v2")
+        self._manifest = {} # intent -> content hash of what is stored
+        self._doc_ids = {} # intent -> stored document ids
+        self._last_rank = None # (query, n, results): routing and the LLM tool shortlist reuse one query
+
+        self._lock = threading.Lock()
+        self._rows = {} # document id -> (intent, L2-normalized vector)
+        self._matrix = None # one row per document
+        self._row_intent = None # row -> index into self._intent_names
+        self._intent_names = []
+        self._load_index()
+
+    def _embed(self, texts):
+        if self._embed_fn is None:
+            self._embed_fn = embedding_functions.DefaultEmbeddingFunction()
+        vecs = np.asarray(self._embed_fn(list(texts)), dtype=np.float32)
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vecs / norms
+
+    def _load_index(self):
+        # Manifest and vectors Chroma already persisted; nothing is re-embedded here
+        include = ["metadatas", "embeddings"] if np is not None else ["metadatas"]
+        try:
+            data = self.collection.get(include=include)
+        except Exception as e:
+            logger.error(f"Semantic Router: could not load intent vectors ({e})")
+            return
+        for doc_id, meta in zip(data["ids"], data["metadatas"]):
+            self._doc_ids.setdefault(meta["intent"], set()).add(doc_id)
+            # Documents stored before hashing have none and get re-embedded once
+            self._manifest[meta["intent"]] = meta.get("hash")
+        if np is None:
+            return
+        embeddings = data.get("embeddings")
+        if embeddings is None or not len(embeddings):
+            return
+        vecs = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        vecs = vecs / norms
+        with self._lock:
+            for doc_id, meta, vec in zip(data["ids"], data["metadatas"], vecs):
+                self._rows[doc_id] = (meta["intent"], vec)
+            self._rebuild()
+
+    def _rebuild(self):
+        # Caller holds the lock
+        if not self._rows:
+            self._matrix, self._row_intent, self._intent_names = None, None, []
+            self._last_rank = None
+            return
+        names = sorted({intent for intent, _ in self._rows.values()})
+        index = {name: i for i, name in enumerate(names)}
+        self._matrix = np.vstack([vec for _, vec in self._rows.values()])
+        self._row_intent = np.array([index[intent] for intent, _ in self._rows.values()], dtype=np.intp)
+        self._intent_names = names
+        self._last_rank = None
+
+    def content_hash(self, intent_name, description, examples=None):
+        raw = json.dumps([intent_name, description, list(examples or []), self.model_name])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
     def register_intent(self, intent_name, description, examples=None):
         """
-        Registers an intent. 
+        Registers an intent.
         We treat the description (and optional examples) as documents for this intent.
         """
-        docs = [description]
-        ids = [f"{intent_name}_desc"]
-        metadatas = [{"intent": intent_name, "type": "description"}]
-        
-        if examples:
-            for i, ex in enumerate(examples):
+        self.register_intents([(intent_name, description, examples)], prune=False)
+
+    def register_intents(self, entries, prune=True):
+        """
+        Syncs the store with (intent_name, description, examples) entries in one batch:
+        only new or changed intents are embedded, and with prune=True intents that are
+        no longer registered are deleted. Returns the number of intents (re)embedded.
+        """
+        # The same intent registered twice (two skills binding it): the last one wins, as in SkillManager
+        entries = {entry[0]: entry for entry in entries}
+        docs, ids, metadatas, changed = [], [], [], {}
+        vecs = None
+        for intent_name, description, examples in entries.values():
+            digest = self.content_hash(intent_name, description, examples)
+            if self._manifest.get(intent_name) == digest:
+                continue
+            changed[intent_name] = [f"{intent_name}_desc"]
+            docs.append(description)
+            metadatas.append({"intent": intent_name, "type": "description", "hash": digest})
+            for i, ex in enumerate(examples or []):
+                changed[intent_name].append(f"{intent_name}_ex_{i}")
                 docs.append(ex)
-                ids.append(f"{intent_name}_ex_{i}")
-                metadatas.append({"intent": intent_name, "type": "example"})
-        
-        # Add to collection (upsert to overwrite if exists)
-        self.collection.upsert(
-            documents=docs,
-            metadatas=metadatas,
-            ids=ids
-        )
+                metadatas.append({"intent": intent_name, "type": "example", "hash": digest})
+            ids.extend(changed[intent_name])
+
+        # Documents to drop: orphaned intents, and examples a changed intent no longer has
+        orphans = [intent for intent in self._doc_ids if prune and intent not in entries]
+        stale = [doc_id for intent in orphans for doc_id in self._doc_ids[intent]]
+        for intent, new_ids in changed.items():
+            stale.extend(self._doc_ids.get(intent, set()) - set(new_ids))
+
+        if ids:
+            if np is None:
+                # Chroma embeds the docs
+                self.collection.upsert(documents=docs, metadatas=metadatas, ids=ids)
+            else:
+                # Embed once here and hand Chroma the vectors, so the index and the store agree
+                vecs = self._embed(docs)
+                self.collection.upsert(documents=docs, metadatas=metadatas, ids=ids, embeddings=vecs.tolist())
+        if stale:
+            self.collection.delete(ids=stale)
+
+        with self._lock:
+            for intent in orphans:
+                del self._doc_ids[intent]
+                self._manifest.pop(intent, None)
+            for doc_id in stale:
+                self._rows.pop(doc_id, None)
+            for intent, new_ids in changed.items():
+                self._doc_ids[intent] = set(new_ids)
+            for doc_id, meta in zip(ids, metadatas):
+                self._manifest[meta["intent"]] = meta["hash"]
+            if vecs is not None:
+                for doc_id, meta, vec in zip(ids, metadatas, vecs):
+                    self._rows[doc_id] = (meta["intent"], vec)
+            if np is not None and (ids or stale):
+                self._rebuild()
+
+        if changed or orphans:
+            logger.info(f"Semantic Router: embedded {len(changed)} intent(s), removed {len(orphans)}, "
+                        f"{len(entries) - len(changed)} unchanged")
+        return len(changed)
+
+    def rank(self, query, n=5):
+        """
+        Returns up to n (intent_name, score) pairs, best first, one entry per intent
+        (an intent scores as its best-matching document).
+        Score uses the same 1 / (1 + distance) heuristic as route().
+        """
+        if self._last_rank and self._last_rank[0] == query and self._last_rank[1] >= n:
+            return self._last_rank[2][:n]
+        if np is None:
+            ranked = self._rank_chroma(query, n)
+        else:
+            ranked = self._rank_matrix(query, n)
+        self._last_rank = (query, n, ranked)
+        return ranked[:n]
+
+    def _rank_matrix(self, query, n):
+        with self._lock:
+            matrix, row_intent, names = self._matrix, self._row_intent, self._intent_names
+        if matrix is None:
+            return []
+        sims = matrix @ self._embed([query])[0]
+        best = np.full(len(names), -np.inf, dtype=np.float32)
+        np.maximum.at(best, row_intent, sims)
+        k = min(n, len(names))
+        top = np.argpartition(-best, k - 1)[:k]
+        top = top[np.argsort(-best[top])]
+        # Chroma's default distance is squared L2, which is 2 - 2*cos for unit vectors;
+        # keeping its scale means the existing score thresholds still apply
+        return [(names[i], float(1 / (1 + max(0.0, 2 - 2 * best[i])))) for i in top]
+
+    def _rank_chroma(self, query, n):
+        count = self.collection.count()
+        if not count:
+            return []
+        # Several documents (description + examples) can belong to one intent
+        results = self.collection.query(query_texts=[query], n_results=min(count, n * 3))
+        ranked = []
+        seen = set()
+        for meta, distance in zip(results['metadatas'][0], results['distances'][0]):
+            if meta['intent'] not in seen:
+                seen.add(meta['intent'])
+                ranked.append((meta['intent'], 1 / (1 + distance)))
+        return ranked
 
     def route(self, query, threshold=0.4):
         """
-        Returns (intent_name, score) or (None, 0.0) if below threshold.
-        Low distance = High similarity. Chroma returns distance.
-        all-MiniLM-L6-v2 distances usually range 0 (identical) to 1.5+.
-        Threshold of 0.4 distance is roughly 0.6 similarity? 
-        Actually, let's just return the top match and let Manager decide.
-        """
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=1
-        )
-        
-        if not results['ids'] or not results['ids'][0]:
-            return None, 0.0
-            
-        # Distance (cosine distance often, or L2)
-        # Chroma default is L2. 
-        # For L2, 0 is perfect. 
-        distance = results['distances'][0][0]
-        intent = results['metadatas'][0][0]['intent']
-        
-        # Convert distance to a "Confidence Score"
-        # Rough heuristic: Score = 1 / (1 + distance)
-        score = 1 / (1 + distance)
-        
-        return intent, score
+        Returns (intent_name, score) for the top match, or (None, 0.0) if nothing is registered.
+        Score = 1 / (1 + distance); the Manager applies its own threshold.
+        """
+        ranked = self.rank(query, 1)
+        return ranked[0] if ranked else (None, 0.0)
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+from NOVA.core.logger import logger
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Coalesces identical blocking calls: while do(key, fn) is running, other
+    threads calling do() with the same key wait for it and share its result.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.shared = 0 # calls answered by someone else's request
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+        if not leader:
+            logger.debug("LLM: joined identical in-flight request")
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+class _StreamFlight:
+    # One producer task feeding a growing chunk list; each subscriber replays it from the start
+    def __init__(self, agen, on_complete):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.subscribers = 0
+        self._changed = asyncio.Event()
+        self.task = asyncio.ensure_future(self._produce(agen, on_complete))
+
+    async def _produce(self, agen, on_complete):
+        try:
+            async for chunk in agen:
+                self.chunks.append(chunk)
+                self._wake()
+            if on_complete:
+                on_complete("".join(self.chunks))
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self._wake()
+            await agen.aclose()
+
+    def _wake(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def subscribe(self):
+        self.subscribers += 1
+        i = 0
+        try:
+            while True:
+                if i < len(self.chunks):
+                    i += 1
+                    yield self.chunks[i - 1]
+                    continue
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                await self._changed.wait()
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done:
+                # Everyone left (e.g. STOP): close the backend stream
+                self.task.cancel()
+
+class StreamFlights:
+    """
+    Async counterpart of SingleFlight for token streams: identical in-flight
+    requests share one backend stream and every subscriber gets all its tokens.
+    """
+    def __init__(self):
+        self._flights = {}
+        self.shared = 0
+
+    async def stream(self, key, factory, on_complete=None):
+        # Flights live on the event loop that started them
+        fkey = (asyncio.get_running_loop(), key)
+        flight = self._flights.get(fkey)
+        if flight is None or flight.task.done():
+            flight = _StreamFlight(factory(), on_complete)
+            self._flights[fkey] = flight
+            flight.task.add_done_callback(lambda _: self._forget(fkey, flight))
+        else:
+            self.shared += 1
+            logger.debug("LLM: joined identical in-flight stream")
+        sub = flight.subscribe()
+        try:
+            async for chunk in sub:
+                yield chunk
+        finally:
+            await sub.aclose()
+
+    def _forget(self, fkey, flight):
+        if self._flights.get(fkey) is flight:
+            del self._flights[fkey]
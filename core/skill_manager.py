@@ -4,14 +4,22 @@ import inspect
 import sys
 import os
 import json
+import time
 from typing import Dict, Any
 
-from NOVA.core.llm import LLMHandler
+from NOVA.core.llm import get_llm_handler
 from NOVA.core.base_skill import BaseSkill
 from NOVA.core.types import SkillResponse
 from NOVA.core.logger import logger
+from NOVA.core.config_manager import config_manager
 
 from NOVA.core.nlp import NLPHandler
+from NOVA.core.semantic_cache import SemanticCache
+from NOVA.core.json_stream import StreamingJSONParser
+from NOVA.core.memory_manager import memory_manager
+from NOVA.core.persona import persona_manager
+from NOVA.core.json_schema import validate, slot_schema
+from NOVA.core.slot_filler import slot_filler
 try:
     from NOVA.core.semantic_router import SemanticRouter
 except ImportError:
@@ -21,13 +29,28 @@ class SkillManager:
     def __init__(self, features_pkg="features"):
         self.features_pkg = features_pkg
         self.skills: Dict[str, BaseSkill] = {} # Map intent -> Skill Instance
-        self.llm = LLMHandler()
+        self.llm = get_llm_handler()
         self.nlp = NLPHandler()
         self.semantic_router = SemanticRouter() if SemanticRouter else None
+        self.semantic_cache = SemanticCache()
+        # "json" (router prompt + synthesis call) or "tools" (native function calling)
+        self.router_mode = config_manager.get("router_mode", "json")
+        # Conversation history sent with router / chat prompts (approx. tokens)
+        self.router_context_tokens = config_manager.get("memory_router_budget_tokens", 300)
+        self.chat_context_tokens = config_manager.get("memory_chat_budget_tokens", 600)
+        # Turns older than this (seconds) are a past session: they don't stop semantic cache use
+        self.cache_session_seconds = config_manager.get("semantic_cache_session_seconds", 600)
+        # LLM router sees only the top-k semantic candidates plus a fixed core set of tools
+        self.shortlist_k = config_manager.get("router_shortlist_k", 5)
+        self.core_tools = config_manager.get("router_core_tools", ["google_search", "decompose_task"])
+        self._catalogue = {} # intent -> router prompt entry, rebuilt on each skill load
+        self._tool_defs = {} # intent -> function-calling schema
         self._load_skills()
 
     def _load_skills(self):
         # loads skills from features pkg
+        self.nlp.clear_registered()
+        intent_docs = [] # (intent, description, examples) for the semantic router
         try:
             # Import the features package to locate it
             package = importlib.import_module(self.features_pkg)
@@ -50,19 +73,64 @@ class SkillManager:
                             skill_instance = obj()
                             logger.info(f"Registering Skill: {skill_instance.name}")
                             
+                            # Skill-declared patterns join the NLP fast path behind a keyword prefilter
+                            if getattr(skill_instance, 'patterns', None):
+                                self.nlp.register_patterns(skill_instance.name, skill_instance.patterns,
+                                                           getattr(skill_instance, 'trigger_keywords', []))
+                            
                             for intent in skill_instance.intents:
                                 self.skills[intent] = skill_instance
                                 logger.debug(f"  -> Bound intent '{intent}' to {skill_instance.name}")
                                 
-                                # Register intent with semantic router
-                                if self.semantic_router:
-                                    self.semantic_router.register_intent(intent, skill_instance.description)
+                                # Collected for one batched semantic router sync below
+                                intent_docs.append((intent, skill_instance.description,
+                                                    getattr(skill_instance, 'examples', None)))
                                 
                 except Exception as e:
                     logger.error(f"Failed to load module {full_name}: {e}")
                     
         except Exception as e:
             logger.error(f"Failed to init features package: {e}")
+        self.nlp.compile()
+        # Only new/changed intents are embedded; intents of removed skills are dropped
+        if self.semantic_router and intent_docs:
+            try:
+                self.semantic_router.register_intents(intent_docs)
+            except Exception as e:
+                logger.error(f"Semantic Router sync failed: {e}")
+        self._build_catalogue()
+
+    def _build_catalogue(self):
+        # Router tool entries only change when skills (re)load
+        self._catalogue = {}
+        self._tool_defs = {}
+        for s_intent, skill in self.skills.items():
+            slots = getattr(skill, 'slots', {}) or {}
+            self._catalogue[s_intent] = {
+                "tool": s_intent,
+                "desc": getattr(skill, 'description', 'No desc'),
+                "args": slots
+            }
+            self._tool_defs[s_intent] = {
+                "type": "function",
+                "function": {
+                    "name": s_intent,
+                    "description": getattr(skill, 'description', 'No desc'),
+                    "parameters": slot_schema(slots)
+                }
+            }
+
+    def _shortlist(self, text):
+        # Candidate intents for the LLM router: semantic top-k + core tools, catalogue order
+        if not self.semantic_router or len(self._catalogue) <= self.shortlist_k + len(self.core_tools):
+            return list(self._catalogue)
+        try:
+            picked = {intent for intent, _ in self.semantic_router.rank(text, self.shortlist_k)}
+        except Exception as e:
+            logger.error(f"Shortlist Error: {e}. Offering all tools.")
+            return list(self._catalogue)
+        picked.update(self.core_tools)
+        return [i for i in self._catalogue if i in picked]
 
     def reload_skills(self):
         # reloads all skills
@@ -102,7 +170,7 @@ class SkillManager:
         else:
             user_msg = entities.get("raw_text", "Hello")
             logger.info("Intent unknown. Delegating to LLM.")
-            llm_text = self.llm.generate(f"The user said: '{user_msg}'. Respond as NOVA/Jarvis.")
+            llm_text = self.llm.generate(f"The user said: '{user_msg}'. Respond as NOVA/Jarvis.", task="chat")
             return SkillResponse(text=llm_text, success=True)
 
     def route_request(self, text: str) -> SkillResponse:
@@ -133,6 +201,7 @@ class SkillManager:
         if confidence > 0.7 and intent in self.skills:
             route_type = "SKILL"
             logger.info(f"Routing to Skill: {intent} (Conf: {confidence})")
+            entities.setdefault("raw_text", text)
             try:
                 response = self.skills[intent].execute(entities)
             except Exception as e:
@@ -142,52 +211,61 @@ class SkillManager:
         # 2a. Semantic Routing (Vector Search)
         if not response and self.semantic_router:
             try:
-                sem_intent, sem_score = self.semantic_router.route(text)
+                # Ranked once here; the LLM router shortlist below reuses the same query
+                ranked = self.semantic_router.rank(text, self.shortlist_k)
+                sem_intent, sem_score = ranked[0] if ranked else (None, 0.0)
                 # Threshold of 0.65 (tune based on all-MiniLM)
                 if sem_intent and sem_score > 0.65: 
                     if sem_intent in self.skills:
                         logger.info(f"Semantic Routing: '{text}' -> {sem_intent} ({sem_score:.2f})")
                         route_type = f"SEMANTIC[{sem_intent}]"
-                        # We lack entities. We can try blank execute or delegate to LLM with hint?
-                        # For now, let's treat it as a strong hint for the LLM Router or execute if simple.
-                        # Simple skills (like 'set_alarm') need entities.
-                        # Complex skills (like 'weather') can handle defaults.
-                        # Strategy: If Semantic match is strong, use LLM to EXTRACT slots for that intent.
-                        # Use LLM-TOOL route logic but forced intent.
-                        
-                        # FORCE LLM ROUTER with Hint?
-                        # ACTUALLY, sticking to the Implementation Plan: 
-                        # "Semantic Routing... Return top Skill."
-                        # If I execute `self.skills[sem_intent].execute({})`:
-                        # Weather -> IP Weather (Works)
-                        # Scheduler -> "When?" (Works)
-                        # Google -> "What search?" (Works)
-                        # So it's safe to execute with empty entities!
-                        response = self.skills[sem_intent].execute({})
+                        # Slots are filled locally from the utterance (no LLM call); unreadable ones stay empty
+                        skill = self.skills[sem_intent]
+                        response = skill.execute(slot_filler.fill(text, skill))
             except Exception as e:
                 logger.error(f"Semantic Router Error: {e}")
         
+        # 2b. Semantic Answer Cache (near-duplicate chat, e.g. "who are you" ~ "what are you")
+        if not response and self.semantic_cache:
+            # Only turns without recent history: a cached answer can't follow up on it
+            hit = self.semantic_cache.lookup(text, self._cache_context())
+            if hit:
+                answer, score = hit
+                route_type = "SEMANTIC-CACHE"
+                logger.info(f"Semantic Cache hit: '{text}' ({score:.2f})")
+                response = SkillResponse(text=answer, success=True, intent="gpt_chat")
+
         # 3. Fallback / Low Confidence
         # 3. Fallback / Low Confidence -> LLM Tool Router
         if not response:
-            route_type = "LLM-ROUTER"
             logger.info(f"Routing to GPT Router (Intent: {intent}, Conf: {confidence})")
+            if self.router_mode == "tools":
+                response, route_type = self._route_llm_tools(text)
+            else:
+                response, route_type = self._route_llm_json(text)
             
-            # Prepare Tool List for Prompt
-            tool_list = []
-            seen_intents = set()
-            for s_intent, skill in self.skills.items():
-                if s_intent not in seen_intents:
-                    tool_list.append({
-                        "tool": s_intent,
-                        "desc": getattr(skill, 'description', 'No desc'),
-                        "args": getattr(skill, 'slots', {})
-                    })
-                    seen_intents.add(s_intent)
-            
-            prompt = f"""You are NOVA. Decide if you should use a tool or chat. 
-Tools: {json.dumps(tool_list)}
+        # Ensure intent is set if the skill didn't set it (optional, but good practice)
+        if hasattr(response, 'intent') and response.intent == "unknown" and intent != "unknown":
+            response.intent = intent
+
+        latency = (time.time() - start_time) * 1000
+        logger.info(f"Request handled via {route_type} in {latency:.2f}ms")
+        
+        return response
 
+    def _route_llm_json(self, text):
+        # Router prompt: one call returns JSON {tool, args, response}, then a synthesis call if a tool ran
+        route_type = "LLM-ROUTER"
+        
+        # Tool list for the prompt: shortlisted entries from the cached catalogue
+        intents = self._shortlist(text)
+        tool_list = [self._catalogue[i] for i in intents]
+        
+        history = memory_manager.build_context(self.router_context_tokens)
+        history_block = f"\nConversation so far:\n{history}\n" if history else ""
+        prompt = f"""You are NOVA. Decide if you should use a tool or chat. 
+Tools: {json.dumps(tool_list)}
+{history_block}
 User: {text}
 
 Output JSON ONLY:
@@ -197,80 +275,237 @@ Output JSON ONLY:
   "response": "Your conversational response here"
 }}
 """
-            model = "gpt-3.5-turbo" 
+        stream = None
+        try:
+            # Stream the router call and parse incrementally: the tool is known as soon as
+            # its field closes, and the "response" text can be shown/spoken while generating.
+            # Ollama and strict-schema OpenAI models decode to the schema; json_object models only
+            # guarantee JSON, so the tool and args are still checked before anything runs.
+            stream = self.llm.stream(prompt, task="route", json_schema=self._router_schema(intents),
+                                     system_prompt=self._persona_prompt("route", text))
+            chunks = iter(stream)
+            parser = StreamingJSONParser(stream_fields=("response",))
+            pending = [] # response text that arrived before the tool was decided
+            for chunk in chunks:
+                for kind, key, value in parser.feed(chunk):
+                    if kind == "delta":
+                        pending.append(value)
+                if parser.done:
+                    break
+                if "tool" in parser.fields:
+                    tool_name = parser.fields["tool"]
+                    # A real tool also needs its args; chat can start right away
+                    if not (tool_name and tool_name in self.skills) or "args" in parser.fields:
+                        break
             
-            try:
-                llm_output = self.llm.generate(prompt, model=model)
-                # Cleaning to ensure JSON
-                if "```json" in llm_output:
-                    llm_output = llm_output.split("```json")[1].split("```")[0].strip()
-                elif "```" in llm_output:
-                    llm_output = llm_output.split("```")[1].split("```")[0].strip()
-                
-                parsed = json.loads(llm_output)
+            tool_name = parser.fields.get("tool")
+            
+            if tool_name and tool_name in self.skills:
+                # The rest of the reply is unused chat text: stop generating it
+                stream.cancel()
+                route_type = f"LLM-TOOL[{tool_name}]"
+                logger.info(f"LLM Selected Tool: {tool_name}")
+                # Execute
+                skill = self.skills[tool_name]
+                tool_args = self._checked_args(skill, parser.fields.get("args"))
+                skill_res = skill.execute(tool_args)
                 
-                tool_name = parsed.get("tool")
-                tool_args = parsed.get("args") or {}
-                conversational_text = parsed.get("response") or ""
+                if not skill.needs_synthesis(text):
+                    # Skill already speaks for itself; skip the synthesis round trip
+                    logger.info(f"Skipping synthesis ({skill.name} output is speakable)")
+                    skill_res.intent = tool_name
+                    return skill_res, route_type
                 
-                if tool_name and tool_name in self.skills:
-                    route_type = f"LLM-TOOL[{tool_name}]"
-                    logger.info(f"LLM Selected Tool: {tool_name}")
-                    # Execute
-                    skill_res = self.skills[tool_name].execute(tool_args)
-                    
-                    # SYNTHESIS STEP
-                    # Instead of returning raw skill text, use LLM to synthesize answer
-                    # This enables "Should I bring an umbrella?" -> (Weather Data) -> "Yes, because..."
-                    tool_out = skill_res.text
-                    synth_prompt = f"""User asked: "{text}"
+                # SYNTHESIS STEP
+                # Instead of returning raw skill text, use LLM to synthesize answer
+                # This enables "Should I bring an umbrella?" -> (Weather Data) -> "Yes, because..."
+                tool_out = skill_res.text
+                synth_prompt = f"""User asked: "{text}"
 Tool '{tool_name}' output: "{tool_out}"
 
 Synthesize a helpful, conversational response based on the tool output. 
 Do not explicitly mention using a tool.
 """
-                    logger.info("Synthesizing response...")
-                    gen = self.llm.generate(synth_prompt, model=model, stream=True)
-                    
-                    # Create new response with stream
-                    response = SkillResponse(
-                        text="", 
-                        intent=tool_name, 
-                        success=skill_res.success,
-                        data=skill_res.data,
-                        visual=skill_res.visual,
-                        is_streaming=True,
-                        iterator=gen
-                    )
-                else:
-                    route_type = "LLM-CHAT"
-                    # STREAMING ENABLED
-                    llm_stream = self.llm.generate(conversational_text or text, model=model, stream=True)
-                    # If conversational_text came from the JSON, it's just a string, not a stream
-                    # But if we want to stream the CHAT generation, we must call generate AGAIN?
-                    # Actually, if the Router gave us a response in JSON, it's already generated.
-                    # To effectively stream, we should NOT ask the Router to generate the response text in the JSON,
-                    # but only decide the tool. If no tool, then we ask LLM to generate chat response WITH streaming.
-                    
-                    if conversational_text:
-                         # Using the pre-generated text (not streamed)
-                         response = SkillResponse(text=conversational_text, success=True, intent="gpt_chat")
-                    else:
-                         # Re-generate with streaming since Router didn't give text
-                         gen = self.llm.generate(f"User said: '{text}'. You are NOVA. Respond briefly.", model=model, stream=True)
-                         response = SkillResponse(text="", success=True, intent="gpt_chat", is_streaming=True, iterator=gen)
-            
-            except Exception as e:
-                logger.error(f"LLM Parsing Error: {e}")
-                # Fallback to simple stream chat
-                gen = self.llm.generate(f"User said: '{text}'. Respond.", model=model, stream=True)
+                logger.info("Synthesizing response...")
+                gen = self.llm.stream(synth_prompt, task="synthesize",
+                                      system_prompt=self._persona_prompt("synthesize", text))
+                
+                # Create new response with stream
+                response = SkillResponse(
+                    text="", 
+                    intent=tool_name, 
+                    success=skill_res.success,
+                    data=skill_res.data,
+                    visual=skill_res.visual,
+                    is_streaming=True,
+                    iterator=gen
+                )
+            else:
+                route_type = "LLM-CHAT"
+                # Keep streaming the router's own "response" field; only call the LLM again if it's empty.
+                streams = [stream]
+                gen = self._router_chat_stream(text, streams, chunks, parser, pending)
+                # Cache only complete answers; STOP cancels the stream, not this generator
+                gen = self.semantic_cache.remember_stream(text, gen, self._cache_context(),
+                                                          cancelled=lambda: any(s.cancelled for s in streams))
                 response = SkillResponse(text="", success=True, intent="gpt_chat", is_streaming=True, iterator=gen)
-            
-        # Ensure intent is set if the skill didn't set it (optional, but good practice)
-        if hasattr(response, 'intent') and response.intent == "unknown" and intent != "unknown":
-            response.intent = intent
-
-        latency = (time.time() - start_time) * 1000
-        logger.info(f"Request handled via {route_type} in {latency:.2f}ms")
         
-        return response
+        except Exception as e:
+            logger.error(f"LLM Parsing Error: {e}")
+            if stream is not None:
+                stream.cancel()
+            # Fallback to simple stream chat
+            gen = self._chat_stream(text, "Respond.")
+            gen = self.semantic_cache.remember_stream(text, gen, self._cache_context())
+            response = SkillResponse(text="", success=True, intent="gpt_chat", is_streaming=True, iterator=gen)
+
+        return response, route_type
+
+    def _router_chat_stream(self, text, streams, chunks, parser, pending):
+        # Yields the router's "response" field token by token as the JSON streams in.
+        # streams[0] is the router's stream; a re-generated chat stream is appended.
+        emitted = False
+        for piece in pending:
+            if piece:
+                emitted = True
+                yield piece
+        if not parser.done:
+            for chunk in chunks:
+                for kind, key, value in parser.feed(chunk):
+                    if kind == "delta" and value:
+                        emitted = True
+                        yield value
+                if parser.done:
+                    break
+        if emitted or streams[0].cancelled:
+            return # STOP before the first token ends the turn, it doesn't re-generate
+        if not parser.started and parser.preamble.strip():
+            # Model ignored the JSON format and just answered
+            yield parser.preamble.strip()
+            return
+        # Re-generate with streaming since Router didn't give text
+        streams.append(self._chat_stream(text))
+        for chunk in streams[-1]:
+            yield chunk
+
+    def _route_llm_tools(self, text):
+        # Native tool calling: tool choice and chat text come from the same response,
+        # and the tool result goes back on the same conversation for the answer.
+        try:
+            history = memory_manager.build_context(self.router_context_tokens)
+            prompt = f"Conversation so far:\n{history}\n\nUser: {text}" if history else text
+            turn = self.llm.tool_turn(prompt, self._tool_schemas(self._shortlist(text)), task="route",
+                                      system_prompt=self._persona_prompt("route", text))
+        except Exception as e:
+            logger.error(f"Tool Router Error: {e}. Falling back to JSON router.")
+            return self._route_llm_json(text)
+
+        if turn.tool_name and turn.tool_name in self.skills:
+            return self._run_tool_turn(text, turn), f"LLM-TOOL[{turn.tool_name}]"
+
+        if turn.iterator is None:
+            # Unknown tool name (hallucinated); answer as plain chat
+            turn.iterator = self._chat_stream(text)
+        gen = self._tool_chat_stream(text, turn, self._cache_context())
+        response = SkillResponse(text="", success=True, intent="gpt_chat", is_streaming=True, iterator=gen)
+        return response, "LLM-CHAT"
+
+    def _run_tool_turn(self, text, turn):
+        logger.info(f"LLM Selected Tool: {turn.tool_name}")
+        skill = self.skills[turn.tool_name]
+        skill_res = skill.execute(turn.tool_args)
+        if not skill.needs_synthesis(text):
+            # Skill already speaks for itself; no need to send the result back
+            logger.info(f"Skipping synthesis ({skill.name} output is speakable)")
+            skill_res.intent = turn.tool_name
+            return skill_res
+        gen = self.llm.tool_result_stream(turn, skill_res.text, task="synthesize",
+                                          system_prompt=self._persona_prompt("synthesize", text))
+        return SkillResponse(
+            text="",
+            intent=turn.tool_name,
+            success=skill_res.success,
+            data=skill_res.data,
+            visual=skill_res.visual,
+            is_streaming=True,
+            iterator=gen
+        )
+
+    def _tool_chat_stream(self, text, turn, cache_context=None):
+        # Chat text of a tool turn. Models sometimes say something before calling a tool;
+        # that call only shows up once the text is done and still runs here.
+        parts = []
+        for chunk in turn.iterator:
+            parts.append(chunk)
+            yield chunk
+        if not turn.tool_name:
+            # turn.iterator wraps the stream, so STOP shows on the stream itself
+            if not (getattr(turn.stream, "cancelled", False) or getattr(turn.iterator, "cancelled", False)):
+                self.semantic_cache.add(text, "".join(parts).strip(), cache_context)
+            return
+        if turn.tool_name not in self.skills:
+            logger.warning(f"LLM called unknown tool '{turn.tool_name}' after its reply; ignored")
+            return
+        res = self._run_tool_turn(text, turn)
+        yield " "
+        if res.is_streaming and res.iterator is not None:
+            yield from res.iterator
+        elif res.text:
+            yield res.text
+
+    def _cache_context(self):
+        # This session's turns; an answer given after them may depend on them
+        return memory_manager.build_context(self.router_context_tokens,
+                                            since=time.time() - self.cache_session_seconds)
+
+    def _chat_stream(self, text, instruction="You are NOVA. Respond briefly."):
+        return self.llm.stream(self._chat_prompt(text, instruction), task="chat",
+                               system_prompt=self._persona_prompt("chat", text))
+
+    def _chat_prompt(self, text, instruction="You are NOVA. Respond briefly."):
+        # Plain chat prompt with recent conversation for follow-up questions
+        history = memory_manager.build_context(self.chat_context_tokens)
+        if history:
+            return f"Conversation so far:\n{history}\n\nUser said: '{text}'. {instruction}"
+        return f"User said: '{text}'. {instruction}"
+
+    def _persona_prompt(self, task, text):
+        # Profile facts are picked for the utterance itself, not the tool list / history around it
+        return persona_manager.get_task_prompt(task, text)
+
+    def _tool_schemas(self, intents=None):
+        # OpenAI/Ollama function-calling schema, one entry per intent (all of them by default)
+        intents = self._tool_defs if intents is None else intents
+        return [self._tool_defs[i] for i in intents]
+
+    def _router_schema(self, intents):
+        # JSON router reply: tool is one of the offered intents (or null), args use only their slot names.
+        # Strict-mode form: every property required, slots the chosen tool doesn't use are null.
+        arg_props = {}
+        for intent in intents:
+            for name, prop in self._tool_defs[intent]["function"]["parameters"]["properties"].items():
+                arg_props[name] = dict(prop, type=["string", "null"])
+        return {
+            "type": "object",
+            "properties": {
+                "tool": {"type": ["string", "null"], "enum": sorted(intents) + [None]},
+                "args": {"type": ["object", "null"], "properties": arg_props, "required": sorted(arg_props),
+                         "additionalProperties": False},
+                "response": {"type": "string"}
+            },
+            "required": ["tool", "args", "response"],
+            "additionalProperties": False
+        }
+
+    def _checked_args(self, skill, args):
+        # The router schema spans all skills; keep only the args valid for this one
+        if not isinstance(args, dict):
+            return {}
+        # Unused slots come back null under the strict router schema
+        args = {k: v for k, v in args.items() if v is not None}
+        schema = slot_schema(getattr(skill, 'slots', {}))
+        errors = validate(args, schema)
+        if not errors:
+            return args
+        logger.warning(f"Router args for {skill.name} dropped: {'; '.join(errors)}")
+        return {k: v for k, v in args.items() if not validate({k: v}, schema)}
@@ -0,0 +1,177 @@
+import re
+from NOVA.core.logger import logger
+
+# Slot name -> extractor type; skills can override per slot with BaseSkill.slot_types
+SLOT_TYPES = {
+    "time": "time",
+    "location": "location",
+    "app_name": "app_name",
+    "action": "app_action",
+    "level": "log_level",
+    "query": "query",
+    "task": "text",
+    "message": "message",
+    "file_path": "path"
+}
+
+_NUMBERS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fifteen": 15, "twenty": 20,
+    "thirty": 30, "forty": 40, "forty five": 45, "fifty": 50, "sixty": 60, "ninety": 90
+}
+_UNIT_SECONDS = {"sec": 1, "second": 1, "min": 60, "minute": 60, "hr": 3600, "hour": 3600}
+_UNIT_NAMES = {1: "seconds", 60: "minutes", 3600: "hours"}
+
+_NUM = r"\d+|" + "|".join(sorted(_NUMBERS, key=len, reverse=True))
+_PART = rf"(?:{_NUM})\s+(?:sec|second|min|minute|hr|hour)s?\b"
+# One or more parts: "10 minutes", "1 hour 30 minutes", "2 minutes and 10 seconds"
+_DURATION = re.compile(rf"\b(?:(?:in|for|after)\s+)?{_PART}(?:(?:\s*,\s*|\s+and\s+|\s+){_PART})*", re.I)
+_DURATION_PART = re.compile(rf"\b(?P<n>{_NUM})\s+(?P<unit>sec|second|min|minute|hr|hour)s?\b", re.I)
+_HALF_HOUR = re.compile(r"\b(?:(?:in|for|after)\s+)?half\s+an?\s+hour\b", re.I)
+_CLOCK = re.compile(
+    r"\b(?:(?:at|for|by)\s+)?(?:(?P<h>\d{1,2}):(?P<m>\d{2})\s*(?P<ampm>[ap]\.?m\.?)?"
+    r"|(?P<h2>\d{1,2})\s*(?P<ampm2>[ap]\.?m\.?)"
+    r"|at\s+(?P<h3>\d{1,2})(?!\s*(?:\d|sec|min|hour|hr)))(?=\W|$)", re.I)
+_NOON = re.compile(r"\b(?:at\s+)?(?P<word>noon|midday|midnight)\b", re.I)
+
+_TRAILING_TIME = (r"(?:\s+(?:today|tomorrow|tonight|now|right now|at night|"
+                  r"(?:this|next|the) (?:morning|afternoon|evening|week|weekend)|"
+                  r"(?:for |over )?(?:the )?(?:next|coming) (?:few |couple (?:of )?|\d+ )?(?:days?|weeks?)))*")
+_LOCATION = re.compile(rf"\b(?:in|for|at|near)\s+(?P<loc>[a-z][\w.'-]*(?:\s+[a-z][\w.'-]*){{0,3}}?){_TRAILING_TIME}(?:\s+please)?\s*[?.!]*$", re.I)
+# What follows in/for/at without being a place: times, days ("for the next few days", "at night"),
+# idioms ("at work") and generic nouns ("in the city")
+_NOT_PLACE = re.compile(
+    r"^(?:(?:the|this|next|last|coming|few|couple|of|a|an)\s+)*(?:today|tonight|tomorrow|yesterday|now|"
+    r"nights?|days?|weeks?|weekends?|months?|morning|afternoon|evening|noon|midnight|moment|while|bit|"
+    r"minutes?|hours?|work|home|school|bed|general|city|town|area|neighbou?rhood|region|country|place|"
+    r"outside|here|there|all|once|least|first|the|this|a|an|me|us|you|it|that|"
+    r"monday|tuesday|wednesday|thursday|friday|saturday|sunday|"
+    r"january|february|march|april|may|june|july|august|september|october|november|december)$", re.I)
+# Day words dropped from a reminder's message ("remind me tomorrow at 9am to ...")
+_DAY = re.compile(r"\b(?:today|tomorrow|tonight|this (?:morning|afternoon|evening))\b", re.I)
+
+_APP = re.compile(r"\b(?P<verb>open|launch|start|close|quit|kill|exit)\s+(?:up\s+)?(?:the\s+|my\s+)?"
+                  r"(?P<app>[\w][\w .+-]*?)(?:\s+app(?:lication)?)?(?:\s+(?:for me|please))*\s*[?.!]*$", re.I)
+_LOG_LEVEL = re.compile(r"\b(debug|info|warning|warn|error|critical)\b", re.I)
+_PATH = re.compile(r"(?:~|\.{1,2})?/?(?:[\w.-]+/)*[\w-]+\.[a-z0-9]{1,5}\b", re.I)
+
+# Command phrasing stripped around a free-text query ("search google for X on the web")
+_LEAD = re.compile(
+    r"^(?:(?:hey\s+)?(?:nova|jarvis)[,\s]+)?(?:(?:can|could|would)\s+you\s+|please\s+|i\s+want\s+to\s+|let's\s+)*"
+    r"(?:(?:search|look)(?:\s+(?:up|google|the\s+web|online|the\s+internet))?(?:\s+for)?|google|find(?:\s+me)?|"
+    r"play|put\s+on|show\s+me|tell\s+me\s+about|look\s+up|ask\s+(?:the\s+)?(?:docs?|knowledge\s+base)(?:\s+about)?)\s+", re.I)
+_TAIL = re.compile(r"\s+(?:on|in|using|with|from)\s+(?:google|youtube|the\s+web|the\s+internet|online)\s*[?.!]*$", re.I)
+_REMIND = re.compile(r"^(?:.*?\b)?(?:(?:remind|ping|wake)\s+me(?:\s+up)?|set\s+(?:a\s+|an\s+)?(?:reminder|alarm|timer))"
+                     r"(?:\s+(?:to|about|that)\b)?\s*", re.I)
+
+class SlotFiller:
+    """
+    Fills a skill's slots from the utterance with local, typed extractors
+    (durations/clock times, locations, app names, log levels, free text), so a
+    semantically routed request can run in one turn without an LLM call.
+    Slots it can't read are left out and the skill handles them as before.
+    """
+    def fill(self, text, skill):
+        entities = {"raw_text": text}
+        types = getattr(skill, 'slot_types', {}) or {}
+        for slot in getattr(skill, 'slots', {}) or {}:
+            kind = types.get(slot) or SLOT_TYPES.get(slot)
+            extractor = getattr(self, f"_extract_{kind}", None) if kind else None
+            if not extractor:
+                continue
+            value = extractor(text)
+            if value:
+                entities[slot] = value
+        filled = {k: v for k, v in entities.items() if k != "raw_text"}
+        if filled:
+            logger.debug(f"SlotFiller: {getattr(skill, 'name', skill)} <- {filled}")
+        return entities
+
+    # --- Extractors (text in, slot value or None out) ---
+
+    def _extract_time(self, text):
+        # Relative durations come out as "N minutes", clock times as 24h "HH:MM"
+        return self._duration(text) or self._clock(text)
+
+    def _duration(self, text):
+        if _HALF_HOUR.search(text):
+            return "30 minutes"
+        m = _DURATION.search(text)
+        if not m:
+            return None
+        # "1 hour 30 minutes" -> "90 minutes": SchedulerSkill reads a single "N unit"
+        total, smallest = 0, 3600
+        for part in _DURATION_PART.finditer(m.group(0)):
+            n = part.group("n").lower()
+            unit = _UNIT_SECONDS[part.group("unit").lower()]
+            total += (int(n) if n.isdigit() else _NUMBERS[n]) * unit
+            smallest = min(smallest, unit)
+        return f"{total // smallest} {_UNIT_NAMES[smallest]}"
+
+    def _clock(self, text):
+        m = _NOON.search(text)
+        if m:
+            return "00:00" if m.group("word").lower() == "midnight" else "12:00"
+        m = _CLOCK.search(text)
+        if not m:
+            return None
+        hour = int(m.group("h") or m.group("h2") or m.group("h3"))
+        minute = int(m.group("m") or 0)
+        ampm = (m.group("ampm") or m.group("ampm2") or "").lower()
+        if ampm.startswith("p") and hour < 12:
+            hour += 12
+        elif ampm.startswith("a") and hour == 12:
+            hour = 0
+        if hour > 23 or minute > 59:
+            return None
+        return f"{hour:02d}:{minute:02d}"
+
+    def _extract_location(self, text):
+        m = _LOCATION.search(text.strip())
+        if not m:
+            return None
+        loc = m.group("loc").strip(" .'")
+        if _NOT_PLACE.match(loc) or _DURATION.search(loc) or _CLOCK.search(f"at {loc}"):
+            return None
+        return loc
+
+    def _extract_app_name(self, text):
+        m = _APP.search(text.strip())
+        return m.group("app").strip() if m else None
+
+    def _extract_app_action(self, text):
+        m = _APP.search(text.strip())
+        if not m:
+            return None
+        return "open" if m.group("verb").lower() in ("open", "launch", "start") else "close"
+
+    def _extract_log_level(self, text):
+        m = _LOG_LEVEL.search(text)
+        if not m:
+            return None
+        level = m.group(1).upper()
+        return "WARNING" if level == "WARN" else level
+
+    def _extract_path(self, text):
+        m = _PATH.search(text)
+        return m.group(0) if m else None
+
+    def _extract_query(self, text):
+        # Free text minus the command around it; the whole utterance if there's nothing to strip
+        query = _TAIL.sub("", _LEAD.sub("", text.strip(), count=1))
+        return query.strip(" ?.!,") or None
+
+    def _extract_text(self, text):
+        return text.strip() or None
+
+    def _extract_message(self, text):
+        # Reminder content: drop the command and any time phrase
+        message = _REMIND.sub("", text.strip(), count=1)
+        message = _DURATION.sub("", _HALF_HOUR.sub("", message))
+        message = _DAY.sub("", _NOON.sub("", _CLOCK.sub("", message)))
+        message = re.sub(r"\s+", " ", message).strip(" ?.!,")
+        # "remind me in 5 minutes to X" leaves "to X" once the time is gone
+        return re.sub(r"^(?:to|about|that)\s+", "", message, flags=re.I) or None
+
+# Singleton instance
+slot_filler = SlotFiller()
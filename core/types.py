@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 @dataclass
 class SkillResponse:
@@ -10,3 +10,15 @@ class SkillResponse:
     visual: Optional[str] = None # For future GUI updates (e.g. image path or HTML)
     is_streaming: bool = False
     iterator: Any = None
+
+@dataclass
+class ToolTurn:
+    # Result of one native tool-calling LLM round trip
+    tool_name: Optional[str] = None
+    tool_args: Dict[str, Any] = field(default_factory=dict)
+    tool_call_id: Optional[str] = None
+    backend: str = "openai"
+    model: str = "gpt-3.5-turbo"
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    iterator: Any = None # Streamed chat text when no tool was chosen (or before a late tool call)
+    stream: Any = None # Underlying LLM stream; its cancelled flag is set by STOP
@@ -2,6 +2,21 @@ from NOVA.core.base_skill import BaseSkill
 from NOVA.core.types import SkillResponse
 import subprocess
 import os
+import re
+
+# Where macOS keeps .app bundles
+APP_DIRS = ["/Applications", "/System/Applications", "/System/Applications/Utilities", "~/Applications"]
+
+def installed_apps(dirs=APP_DIRS):
+    """Lowercased names of the apps found in dirs."""
+    names = set()
+    for folder in dirs:
+        try:
+            entries = os.listdir(os.path.expanduser(folder))
+        except OSError:
+            continue
+        names.update(e[:-4].lower() for e in entries if e.endswith(".app"))
+    return names
 
 class AppControlSkill(BaseSkill):
     def __init__(self):
@@ -13,6 +28,19 @@ class AppControlSkill(BaseSkill):
             "action": "open or close", 
             "app_name": "Name of the application (e.g. Spotify, Calculator)"
         }
+        self.speakable_output = True
+        # "open spotify", "quit the calculator app for me". Only installed app names are claimed,
+        # so "open a new tab" or "close the door" fall through to the routers.
+        self.patterns = []
+        apps = installed_apps()
+        if apps:
+            names = "|".join(re.escape(a) for a in sorted(apps, key=len, reverse=True))
+            app = rf"(?:the\s+)?(?P<app_name>{names})(?:\s+app(?:lication)?)?(?:\s+(?:for\s+me|please))*$"
+            self.patterns = [
+                (r"^(?:open|launch)\s+" + app, "open_app"),
+                (r"^(?P<action>close|quit)\s+" + app, "close_app")
+            ]
+        self.trigger_keywords = ["open", "launch", "close", "quit"]
         self.blacklist = ["finder", "dock", "loginwindow", "nova", "python", "terminal", "iterm"]
 
     def execute(self, entities: dict) -> SkillResponse:
@@ -46,6 +46,8 @@ class TimeSkill(BaseSkill):
         self.intents = ["get_time"]
         self.description = "Gets the current time."
         self.slots = {}
+        self.speakable_output = True
+        self.synthesis_triggers = [r"\bshould i\b", r"\bhow (long|much time)\b", r"\buntil\b", r"\btoo late\b"]
         
     def execute(self, entities: dict) -> SkillResponse:
         now = datetime.datetime.now()
@@ -59,6 +61,8 @@ class DateSkill(BaseSkill):
         self.intents = ["get_date"]
         self.description = "Gets the current date."
         self.slots = {}
+        self.speakable_output = True
+        self.synthesis_triggers = [r"\bhow (long|many days)\b", r"\buntil\b", r"\bweekend\b"]
         
     def execute(self, entities: dict) -> SkillResponse:
         now = datetime.datetime.now()
@@ -9,6 +9,7 @@ class GoogleSkill(BaseSkill):
         self.intents = ["google_search"]
         self.description = "Search Google for external information, news, or general knowledge. Do NOT use for saving user facts."
         self.slots = {"query": "What to search for"}
+        self.speakable_output = True
 
     def execute(self, entities: dict) -> SkillResponse:
         query = entities.get("query", "")
@@ -40,6 +40,7 @@ class KnowledgeIngestionSkill(BaseSkill):
         self.slots = {
             "file_path": "Path to document to ingest"
         }
+        self.speakable_output = True
 
     def execute(self, entities: dict) -> SkillResponse:
         collection = get_knowledge_collection()
@@ -1,8 +1,18 @@
 from PyQt5 import QtCore
 from NOVA.core.base_skill import BaseSkill
 from NOVA.core.types import SkillResponse
-from NOVA.core.llm import LLMHandler
-import json
+from NOVA.core.llm import get_llm_handler
+from NOVA.core.logger import logger
+
+# Structured output has to be an object at the top level (OpenAI response_format)
+PLAN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "steps": {"type": "array", "items": {"type": "string"}, "minItems": 1}
+    },
+    "required": ["steps"],
+    "additionalProperties": False
+}
 
 class ReasoningSkill(QtCore.QObject, BaseSkill):
     request_sequence = QtCore.pyqtSignal(list) # Re-using the concept of sequence execution
@@ -16,7 +26,8 @@ class ReasoningSkill(QtCore.QObject, BaseSkill):
         self.slots = {
             "task": "The complex task description"
         }
-        self.llm = LLMHandler()
+        self.speakable_output = True
+        self.llm = get_llm_handler()
 
     def execute(self, entities: dict) -> SkillResponse:
         task = entities.get("task") or entities.get("raw_text")
@@ -32,23 +43,19 @@ Break this down into a sequential list of simple voice commands that NOVA can un
 NOVA understands: "Open [App]", "Close [App]", "Set alarm for [Time]", "Search google for [Query]", "What is the weather", "Play [Topic] on youtube".
 
 Output JSON ONLY:
-["command 1", "command 2", ...]
+{{"steps": ["command 1", "command 2", ...]}}
 """
         try:
-            llm_output = self.llm.generate(prompt, model="gpt-3.5-turbo")
-            # Cleaning
-            if "```json" in llm_output:
-                llm_output = llm_output.split("```json")[1].split("```")[0].strip()
-            elif "```" in llm_output:
-                llm_output = llm_output.split("```")[1].split("```")[0].strip()
-            
-            steps = json.loads(llm_output)
+            # Constrained to PLAN_SCHEMA, so no markdown fences to strip
+            steps = self.llm.generate_json(prompt, PLAN_SCHEMA, task="plan")["steps"]
             
-            if isinstance(steps, list) and len(steps) > 0:
+            if len(steps) > 0:
                 self.request_sequence.emit(steps)
                 return SkillResponse(text=f"I've broken that down into {len(steps)} steps. Executing now.")
             else:
                  return SkillResponse(text="I couldn't verify the plan steps.", success=False)
 
         except Exception as e:
-            return SkillResponse(text=f"Planning failed: {e}", success=False)
+            # Output is spoken as-is, so the details only go to the log
+            logger.error(f"ReasoningSkill: planning failed for '{task}': {e}")
+            return SkillResponse(text="Sorry, I couldn't work out a plan for that.", success=False)
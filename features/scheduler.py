@@ -22,6 +22,16 @@ class SchedulerSkill(QtCore.QObject, BaseSkill):
             "time": "Time string (e.g. 5pm, 17:00, 10 minutes)",
             "message": "Content of the reminder"
         }
+        self.speakable_output = True
+        # Only time formats _parse_time understands ("10 minutes", "17:30")
+        when = r"(?P<time>\d+\s+(?:seconds?|minutes?|hours?)|\d{1,2}:\d{2})"
+        self.patterns = [
+            (r"^remind\s+me\s+(?:in|at)\s+" + when + r"\s+to\s+(?P<message>.+)$", "set_reminder"),
+            (r"^remind\s+me\s+to\s+(?P<message>.+?)\s+(?:in|at)\s+" + when + "$", "set_reminder"),
+            (r"^(?:set\s+)?(?:an?\s+)?(?:alarm|timer|reminder)\s+(?:for|at|in)\s+" + when + "$", "set_alarm"),
+            (r"^wake\s+me(?:\s+up)?\s+(?:at|in)\s+" + when + "$", "set_alarm")
+        ]
+        self.trigger_keywords = ["remind", "alarm", "timer", "wake"]
         
         self.reminders_file = os.path.join(os.path.dirname(__file__), "../config/reminders.json")
         self.running = True
@@ -17,6 +17,7 @@ class SystemSkill(QtCore.QObject, BaseSkill):
         self.slots = {
             "level": "Log level (DEBUG, INFO, WARNING, ERROR)"
         }
+        self.speakable_output = True
 
     def execute(self, entities: dict) -> SkillResponse:
         intent = entities.get("intent") # Main might not pass intent directly in entities if regex?
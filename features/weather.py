@@ -10,6 +10,12 @@ class WeatherSkill(BaseSkill):
         self.intents = ["get_weather"]
         self.description = "Gets the current weather for a specific city or current location."
         self.slots = {"location": "City name (optional, defaults to current location)"}
+        self.speakable_output = True
+        # Questions the weather sentence doesn't answer directly
+        self.synthesis_triggers = [
+            r"\bshould i\b", r"\bdo i need\b", r"\bumbrella\b", r"\bjacket\b", r"\bcoat\b",
+            r"\bwear\b", r"\bwill it\b", r"\bgood (day|time)\b"
+        ]
 
     def execute(self, entities: dict) -> SkillResponse:
         city = entities.get("location", None)
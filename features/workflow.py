@@ -17,6 +17,13 @@ class WorkflowSkill(QtCore.QObject, BaseSkill):
             "name": "Name of the workflow",
             "steps": "Steps (comma separated) for creation"
         }
+        self.speakable_output = True
+        # "run workflow morning routine" / "start the morning routine workflow" (creation needs the LLM for steps)
+        self.patterns = [
+            (r"^(?:run|start|execute)\s+(?:the\s+)?workflow\s+(?P<name>[\w ]+?)$", "run_workflow"),
+            (r"^(?:run|start|execute)\s+(?:the\s+|my\s+)?(?P<name>[\w ]+?)\s+workflow$", "run_workflow")
+        ]
+        self.trigger_keywords = ["workflow"]
         
         self.workflows_file = os.path.join(os.path.dirname(__file__), "../config/workflows.json")
         self._load_workflows()
@@ -9,6 +9,7 @@ class YoutubeSkill(BaseSkill):
         self.intents = ["play_youtube"]
         self.description = "Play a video on YouTube."
         self.slots = {"query": "Video topic or song name"}
+        self.speakable_output = True
 
     def execute(self, entities: dict) -> SkillResponse:
         topic = entities.get("query", "")
@@ -17,7 +17,8 @@ from NOVA.core.stt import WhisperSTT
 from NOVA.core.nlp import NLPHandler
 from NOVA.core.skill_manager import SkillManager
 from NOVA.core.tts import TTSModule
-from NOVA.core.memory_manager import MemoryManager
+from NOVA.core.memory_manager import memory_manager
+from NOVA.core.llm_scheduler import llm_scheduler
 from NOVA.core.logger import logger
 
 class NovaWorker(QtCore.QObject):
@@ -40,7 +41,7 @@ class NovaWorker(QtCore.QObject):
         self.nlp = NLPHandler()
         self.skill_manager = SkillManager("features")
         self.tts = TTSModule()
-        self.memory = MemoryManager()
+        self.memory = memory_manager # shared with the router/chat prompts
         self.is_running = False
         self.current_state = "idle"
         self.stop_requested = False
@@ -95,11 +96,13 @@ class NovaWorker(QtCore.QObject):
         # Wait for TTS
         time.sleep(2)
         
-        for i, step in enumerate(steps):
-             if self.stop_requested: break
-             self.log_message.emit(f"Workflow Step {i+1}: {step}", "INFO")
-             time.sleep(1)
-             self.process_text_logic(step)
+        # Steps yield the LLM backends to live voice turns
+        with llm_scheduler.priority("workflow"):
+            for i, step in enumerate(steps):
+                 if self.stop_requested: break
+                 self.log_message.emit(f"Workflow Step {i+1}: {step}", "INFO")
+                 time.sleep(1)
+                 self.process_text_logic(step)
 
     def update_sensitivity(self, value):
         if self.wake_word_listener:
@@ -142,6 +145,8 @@ class NovaWorker(QtCore.QObject):
             self.log_message.emit("Mic Button: Stop Requested.", "INFO")
             self.stop_requested = True
             # We can't easily kill the STT thread, but we can ignore its result.
+            # LLM streams we CAN kill: close the HTTP stream now instead of draining it.
+            self.skill_manager.llm.cancel_streams()
             self.state_change.emit("idle") # Visual feedback immediately
             self.current_state = "idle"
             
@@ -284,6 +289,8 @@ class NovaWorker(QtCore.QObject):
             full_text = ""
             try:
                 for chunk in skill_response.iterator:
+                    if self.stop_requested:
+                        break
                     if chunk:
                         full_text += chunk
                         self.token_received.emit(chunk)
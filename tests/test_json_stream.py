@@ -0,0 +1,60 @@
+import json
+import unittest
+from NOVA.core.json_stream import StreamingJSONParser
+
+def feed_all(parser, chunks):
+    events = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    return events
+
+def streamed(events, key="response"):
+    return "".join(value for kind, k, value in events if kind == "delta" and k == key)
+
+class TestStreamingJSONParser(unittest.TestCase):
+    def test_escapes_split_across_chunks(self):
+        text = r'{"tool": null, "args": null, "response": "Say \"hi\"\n\tcaf\u00e9 \ud83d\ude00 a\\b\/c"}'
+        expected = json.loads(text)["response"]
+        # Every possible chunk boundary, including inside \" and \uXXXX
+        for size in (1, 2, 3, 5, 7):
+            parser = StreamingJSONParser()
+            events = feed_all(parser, [text[i:i + size] for i in range(0, len(text), size)])
+            self.assertEqual(streamed(events), expected, f"chunk size {size}")
+            self.assertEqual(parser.fields, json.loads(text))
+            self.assertTrue(parser.done)
+            self.assertEqual(events[-1], ("end", None, None))
+
+    def test_nested_args(self):
+        text = ('{"tool": "get_weather", "args": {"location": "New {York}", "opts": {"units": ["c", "f"], '
+                '"note": "a \\"}\\" b"}}, "response": "Checking."}')
+        parser = StreamingJSONParser()
+        events = feed_all(parser, [text[i:i + 4] for i in range(0, len(text), 4)])
+        fields = [(k, v) for kind, k, v in events if kind == "field"]
+        self.assertEqual([k for k, _ in fields], ["tool", "args", "response"])
+        self.assertEqual(fields[1][1], json.loads(text)["args"])
+        self.assertEqual(streamed(events), "Checking.")
+
+    def test_args_known_before_response_finishes(self):
+        # The router dispatches as soon as tool + args have closed
+        parser = StreamingJSONParser()
+        parser.feed('{"tool": "get_weather", "args": {"location": "Dallas"}, "response": "Let me')
+        self.assertEqual(parser.fields, {"tool": "get_weather", "args": {"location": "Dallas"}})
+        self.assertFalse(parser.done)
+
+    def test_preamble_before_json(self):
+        parser = StreamingJSONParser()
+        events = feed_all(parser, ["Sure! ```json\n", '{"tool": null, "args": null, ', '"response": "Hi"}', "\n```"])
+        self.assertEqual(parser.preamble, "Sure! ```json\n")
+        self.assertEqual(streamed(events), "Hi")
+        self.assertEqual(parser.fields["response"], "Hi")
+
+    def test_json_never_starts(self):
+        parser = StreamingJSONParser()
+        events = feed_all(parser, ["I'm doing well, ", "thanks for asking."])
+        self.assertEqual(events, [])
+        self.assertFalse(parser.started)
+        self.assertFalse(parser.done)
+        self.assertEqual(parser.preamble, "I'm doing well, thanks for asking.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,43 +1,50 @@
+import asyncio
+import threading
+import time
 import unittest
-from unittest.mock import patch, MagicMock
-import requests
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock, AsyncMock
 from NOVA.core.llm import LLMHandler
+from NOVA.core.llm_cache import response_cache
+from NOVA.core.persona import DEFAULT_TASK_PROMPTS
+from NOVA.core.llm_scheduler import LLMScheduler, LLMShedError
+from NOVA.core.circuit_breaker import circuit_breakers
+from NOVA.core.llm_metrics import LLMMetrics
+from NOVA.core.llm_tiers import task_tiers
+from NOVA.core.llm_clients import LLMClientRegistry
 
 class TestLLMHandler(unittest.TestCase):
-    @patch('core.llm.openai')
-    @patch('core.llm.requests')
-    def test_online_openai(self, mock_requests, mock_openai):
+    def setUp(self):
+        response_cache.clear()
+        circuit_breakers.breakers.clear()
+
+    @patch('NOVA.core.llm.connectivity_monitor')
+    @patch('NOVA.core.llm.llm_registry')
+    def test_online_openai(self, mock_registry, mock_monitor):
         # Setup: Online + Key present
-        mock_requests.get.return_value.status_code = 200 # Google ping OK
-        
-        # Ensure we don't accidentally swallow exception type checks if code uses them
-        # But here we just mock the .get call success
+        mock_monitor.is_online.return_value = True
         
-        # Mock OpenAI response
+        # Mock OpenAI response (client comes from the shared registry)
         mock_completion = MagicMock()
         mock_completion.choices = [MagicMock(message=MagicMock(content="Hello from OpenAI"))]
-        mock_openai.OpenAI.return_value.chat.completions.create.return_value = mock_completion
+        mock_registry.get_openai_client.return_value.chat.completions.create.return_value = mock_completion
         
         handler = LLMHandler()
         handler.openai_key = "fake-key"
         
         response = handler.generate("Hi")
         self.assertEqual(response, "Hello from OpenAI")
+        mock_registry.get_openai_client.assert_called_with("fake-key")
         
     def test_offline_fallback(self):
-        # We need to patch requests.get specifically to modify behavior, 
-        # but NOT patch the entire module so we can use requests.ConnectionError
+        # Patch only the pooled session, NOT the requests module, so we can use requests.ConnectionError
         
-        with patch('core.llm.requests.get') as mock_get, \
-             patch('core.llm.requests.post') as mock_post:
-            
-            # Setup: Offline (requests.get fails with ACTUAL requests.ConnectionError)
-            def side_effect(*args, **kwargs):
-                if "google" in args[0]:
-                    raise requests.ConnectionError("Offline")
-                return MagicMock()
+        with patch('NOVA.core.llm.connectivity_monitor') as mock_monitor, \
+             patch('NOVA.core.llm.llm_registry') as mock_registry:
             
-            mock_get.side_effect = side_effect
+            # Setup: Offline
+            mock_monitor.is_online.return_value = False
+            mock_post = mock_registry.get_ollama_session.return_value.post
             
             # Mock local LLM response
             mock_post.return_value.status_code = 200
@@ -50,5 +57,361 @@ class TestLLMHandler(unittest.TestCase):
             response = handler.generate("Hi")
             self.assertEqual(response, "Hello from Local")
 
+    def test_generate_uses_cached_connectivity(self):
+        # generate() reads the shared monitor state instead of pinging the network
+        with patch('NOVA.core.llm.connectivity_monitor') as mock_monitor, \
+             patch('NOVA.core.llm.llm_registry') as mock_registry:
+            mock_monitor.is_online.return_value = False
+            mock_post = mock_registry.get_ollama_session.return_value.post
+            mock_post.return_value.status_code = 200
+            mock_post.return_value.json.return_value = {"response": "Hello from Local"}
+
+            handler = LLMHandler()
+            handler.openai_key = "fake-key"
+
+            response = handler.generate("Hi")
+            self.assertEqual(response, "Hello from Local")
+            mock_monitor.is_online.assert_called()
+
+    def test_response_cache_hit(self):
+        with patch('NOVA.core.llm.connectivity_monitor') as mock_monitor, \
+             patch('NOVA.core.llm.llm_registry') as mock_registry:
+            mock_monitor.is_online.return_value = False
+            mock_post = mock_registry.get_ollama_session.return_value.post
+            mock_post.return_value.status_code = 200
+            mock_post.return_value.json.return_value = {"response": "Cached answer"}
+
+            handler = LLMHandler()
+            handler.openai_key = None
+
+            self.assertEqual(handler.generate("Same prompt"), "Cached answer")
+            self.assertEqual(handler.generate("Same prompt"), "Cached answer")
+            self.assertEqual(mock_post.call_count, 1)
+
+            # Streaming hit replays the stored text
+            self.assertEqual("".join(handler.generate("Same prompt", stream=True)), "Cached answer")
+            self.assertEqual(mock_post.call_count, 1)
+
+            # Opt-out always reaches the backend
+            handler.generate("Same prompt", cache=False)
+            self.assertEqual(mock_post.call_count, 2)
+
+    def test_task_tier_selects_model(self):
+        # Classification goes to the small local model with its own token budget
+        with patch('NOVA.core.llm.connectivity_monitor') as mock_monitor, \
+             patch('NOVA.core.llm.llm_registry') as mock_registry, \
+             patch.dict('NOVA.core.llm.task_tiers.tiers', {"classify": {
+                 "model": "gpt-3.5-turbo", "local_model": "tiny", "backend": "local",
+                 "max_tokens": 5, "timeout": 2}}):
+            mock_monitor.is_online.return_value = True
+            mock_post = mock_registry.get_ollama_session.return_value.post
+            mock_post.return_value.status_code = 200
+            mock_post.return_value.json.return_value = {"response": "positive"}
+
+            handler = LLMHandler()
+            handler.openai_key = "fake-key"
+
+            self.assertEqual(handler.generate("Label this", task="classify"), "positive")
+            payload = mock_post.call_args[1]["json"]
+            self.assertEqual(payload["model"], "tiny")
+            self.assertEqual(payload["options"]["num_predict"], 5)
+            # Internal calls get the lean prompt, not persona + profile
+            self.assertEqual(payload["system"], DEFAULT_TASK_PROMPTS["classify"])
+            self.assertEqual(mock_post.call_args[1]["timeout"], 2)
+            mock_registry.get_openai_client.assert_not_called()
+
+    def test_generate_json_constrained_and_validated(self):
+        schema = {"type": "object", "properties": {"steps": {"type": "array", "items": {"type": "string"}}},
+                  "required": ["steps"]}
+        with patch('NOVA.core.llm.connectivity_monitor') as mock_monitor, \
+             patch('NOVA.core.llm.llm_registry') as mock_registry:
+            mock_monitor.is_online.return_value = False
+            mock_post = mock_registry.get_ollama_session.return_value.post
+            mock_post.return_value.status_code = 200
+            mock_post.return_value.json.return_value = {"response": '{"steps": ["open spotify"]}'}
+
+            handler = LLMHandler()
+            handler.openai_key = None
+
+            self.assertEqual(handler.generate_json("Plan", schema), {"steps": ["open spotify"]})
+            self.assertEqual(mock_post.call_args[1]["json"]["format"], schema)
+
+            # Output that breaks the schema raises and is never cached
+            mock_post.return_value.json.return_value = {"response": '{"steps": "open spotify"}'}
+            with self.assertRaises(ValueError):
+                handler.generate_json("Plan again", schema)
+            with self.assertRaises(ValueError):
+                handler.generate_json("Plan again", schema)
+            self.assertEqual(mock_post.call_count, 3)
+
+        # Models without json_schema support still get JSON mode
+        handler.json_schema_models = ("gpt-4o",)
+        tier = {"task": "plan", "model": "gpt-3.5-turbo", "json_schema": schema}
+        self.assertEqual(handler._openai_format(tier), {"response_format": {"type": "json_object"}})
+        tier["model"] = "gpt-4o-mini"
+        fmt = handler._openai_format(tier)["response_format"]["json_schema"]
+        self.assertEqual(fmt["schema"], schema)
+        # additionalProperties isn't false, so OpenAI strict mode would reject it: sent non-strict
+        self.assertFalse(fmt["strict"])
+        tier["json_schema"] = dict(schema, additionalProperties=False)
+        self.assertTrue(handler._openai_format(tier)["response_format"]["json_schema"]["strict"])
+
+    def test_circuit_opens_after_timeout(self):
+        # A timeout opens the breaker, so the next call goes straight to local
+        with patch('NOVA.core.llm.connectivity_monitor') as mock_monitor, \
+             patch('NOVA.core.llm.llm_registry') as mock_registry, \
+             patch('NOVA.core.llm.openai') as mock_openai:
+            mock_monitor.is_online.return_value = True
+            mock_openai.APIConnectionError = type("APIConnectionError", (Exception,), {})
+            mock_openai.APITimeoutError = type("APITimeoutError", (Exception,), {})
+            create = mock_registry.get_openai_client.return_value.chat.completions.create
+            create.side_effect = mock_openai.APITimeoutError("timed out")
+            mock_post = mock_registry.get_ollama_session.return_value.post
+            mock_post.return_value.status_code = 200
+            mock_post.return_value.json.return_value = {"response": "Hello from Local"}
+
+            handler = LLMHandler()
+            handler.openai_key = "fake-key"
+
+            self.assertEqual(handler.generate("Hi", cache=False), "Hello from Local")
+            self.assertEqual(handler.generate("Hi", cache=False), "Hello from Local")
+            self.assertEqual(create.call_count, 1)
+            self.assertEqual(handler.backend_stats()["openai"]["circuit"]["state"], "open")
+
+    def test_half_open_probe_reaches_openai(self):
+        # After the cooldown the probe must go to OpenAI, even on the race path and after a cache hit
+        class FakeStream:
+            def __init__(self, tokens):
+                self.chunks = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=t))])
+                               for t in tokens]
+            async def __aiter__(self):
+                for chunk in self.chunks:
+                    yield chunk
+            async def close(self):
+                pass
+
+        async def slow_local(*args, **kwargs):
+            await asyncio.sleep(0.3)
+            yield "local"
+
+        breaker = circuit_breakers.get("openai")
+        def trip():
+            breaker.record_failure("timed out", hard=True)
+            breaker.opened_at -= breaker.cooldown
+
+        with patch('NOVA.core.llm.connectivity_monitor') as mock_monitor, \
+             patch('NOVA.core.llm.llm_registry') as mock_registry:
+            mock_monitor.is_online.return_value = True
+            create = mock_registry.get_openai_client.return_value.chat.completions.create
+            create.return_value = MagicMock(choices=[MagicMock(message=MagicMock(content="Fresh answer"))])
+            async_client = mock_registry.get_async_openai_client.return_value
+            async_client.chat.completions.create = AsyncMock(return_value=FakeStream(["Hi", " there"]))
+
+            handler = LLMHandler()
+            handler.openai_key = "fake-key"
+            handler.generate("Cached question")
+
+            trip()
+            self.assertEqual(handler.generate("Cached question"), "Fresh answer")
+            self.assertIsNone(breaker._probe_started) # the cache hit didn't take the probe
+
+            with patch.object(handler, '_astream_local', side_effect=slow_local):
+                self.assertEqual(handler.generate("Hi", race=True, cache=False), "Hi there")
+            self.assertEqual(breaker.snapshot()["state"], "closed")
+
+            # A probe whose request is cancelled before any outcome is handed back
+            trip()
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.available())
+            breaker.release()
+            self.assertTrue(breaker.available())
+
+    def test_timeout_follows_task_tier_p95(self):
+        # Short classify calls must not inherit the p95 of long chat completions
+        metrics = LLMMetrics()
+        for _ in range(10):
+            metrics.record_ttft("openai", 0.5, "classify")
+            metrics.record_ttft("openai", 6.0, "chat")
+        with patch('NOVA.core.llm.llm_metrics', metrics):
+            handler = LLMHandler()
+            self.assertEqual(handler._openai_timeout(task_tiers.resolve("classify")), handler.timeout_floor)
+            self.assertEqual(handler._openai_timeout(task_tiers.resolve("chat")), 6.0 * handler.timeout_factor)
+            # Not enough samples for this tier yet: its configured timeout
+            self.assertEqual(handler._openai_timeout(task_tiers.resolve("plan")), task_tiers.resolve("plan")["timeout"])
+
+    def test_openai_clients_do_not_retry(self):
+        # One timed-out attempt goes straight to the breaker / local fallback
+        with patch('NOVA.core.llm_clients.openai') as mock_openai:
+            LLMClientRegistry()._build_openai_client("fake-key")
+        self.assertEqual(mock_openai.OpenAI.call_args[1]["max_retries"], 0)
+
+    def test_identical_requests_share_one_call(self):
+        calls = []
+
+        async def slow_local(*args, **kwargs):
+            calls.append(args)
+            for token in ["one", " two"]:
+                await asyncio.sleep(0.05)
+                yield token
+
+        with patch('NOVA.core.llm.connectivity_monitor') as mock_monitor:
+            mock_monitor.is_online.return_value = False
+            handler = LLMHandler()
+            handler.openai_key = None
+
+            async def both():
+                return await asyncio.gather(handler.agenerate("Plan it", cache=False),
+                                            handler.agenerate("Plan it", cache=False))
+
+            with patch.object(handler, '_astream_local', side_effect=slow_local):
+                results = asyncio.run(both())
+
+        self.assertEqual(results, ["one two", "one two"])
+        self.assertEqual(len(calls), 1)
+
+    def test_scheduler_priority_and_shedding(self):
+        scheduler = LLMScheduler()
+        scheduler.limits = {"local": 1}
+        scheduler.reserve = 0
+        order = []
+
+        scheduler.acquire("local", "interactive")
+        def waiter(priority, deadline=None):
+            try:
+                scheduler.acquire("local", priority, deadline)
+            except LLMShedError:
+                order.append(f"{priority}-shed")
+                return
+            order.append(priority)
+            scheduler.release("local")
+
+        threads = [
+            threading.Thread(target=waiter, args=("background", time.monotonic() + 0.05)),
+            threading.Thread(target=waiter, args=("workflow",)),
+            threading.Thread(target=waiter, args=("interactive",))
+        ]
+        for t in threads:
+            t.start()
+            time.sleep(0.01)
+        self.assertEqual(scheduler.stats()["backends"]["local"]["queued"]["workflow"], 1)
+        time.sleep(0.1) # background waiter passes its deadline
+        scheduler.release("local")
+        for t in threads:
+            t.join()
+
+        self.assertEqual(order, ["background-shed", "interactive", "workflow"])
+        self.assertEqual(scheduler.stats()["priorities"]["background"]["shed"], 1)
+
+    def test_race_first_token_wins(self):
+        closed = []
+
+        async def slow_openai(*args, **kwargs):
+            try:
+                await asyncio.sleep(0.5)
+                yield "slow"
+            finally:
+                closed.append("openai")
+
+        async def fast_local(*args, **kwargs):
+            try:
+                yield "fast"
+                yield " answer"
+            finally:
+                closed.append("local")
+
+        with patch('NOVA.core.llm.connectivity_monitor') as mock_monitor:
+            mock_monitor.is_online.return_value = True
+            handler = LLMHandler()
+            handler.openai_key = "fake-key"
+            with patch.object(handler, '_astream_openai', side_effect=slow_openai), \
+                 patch.object(handler, '_astream_local', side_effect=fast_local):
+                t0 = time.time()
+                response = handler.generate("Hi", race=True, cache=False)
+
+        self.assertEqual(response, "fast answer")
+        self.assertLess(time.time() - t0, 0.5) # loser was cancelled, not awaited
+        self.assertIn("openai", closed)
+
+    def test_tool_turn_tool_or_text(self):
+        async def tool_events(*args, **kwargs):
+            yield ("tool", "get_weather", {"location": "Dallas"}, "call_1", "openai")
+
+        async def text_events(*args, **kwargs):
+            yield ("text", "")
+            yield ("text", "Hello")
+            yield ("text", " there")
+
+        async def late_tool_events(*args, **kwargs):
+            yield ("text", "Let me check.")
+            yield ("tool", "get_weather", {"location": "Dallas"}, "call_2", "openai")
+
+        with patch('NOVA.core.llm.connectivity_monitor') as mock_monitor:
+            mock_monitor.is_online.return_value = True
+            handler = LLMHandler()
+            handler.openai_key = "fake-key"
+
+            with patch.object(handler, '_atool_events', side_effect=tool_events):
+                turn = handler.tool_turn("Weather in Dallas", tools=[])
+            self.assertEqual(turn.tool_name, "get_weather")
+            self.assertEqual(turn.tool_args, {"location": "Dallas"})
+            self.assertIsNone(turn.iterator)
+
+            with patch.object(handler, '_atool_events', side_effect=text_events):
+                turn = handler.tool_turn("Hi", tools=[])
+                self.assertIsNone(turn.tool_name)
+                self.assertEqual("".join(turn.iterator), "Hello there")
+
+            # A tool call after some text is kept, not dropped
+            with patch.object(handler, '_atool_events', side_effect=late_tool_events):
+                turn = handler.tool_turn("Weather in Dallas", tools=[])
+                self.assertIsNone(turn.tool_name)
+                self.assertEqual("".join(turn.iterator), "Let me check.")
+                self.assertEqual((turn.tool_name, turn.tool_args), ("get_weather", {"location": "Dallas"}))
+
+    def test_stream_cancel_closes_generator(self):
+        # STOP must close the underlying async stream, not drain it
+        closed = []
+
+        async def endless(*args, **kwargs):
+            try:
+                while True:
+                    yield "tok"
+                    await asyncio.sleep(0.01)
+            finally:
+                closed.append(True)
+
+        handler = LLMHandler()
+        with patch.object(handler, 'astream', side_effect=endless):
+            stream = handler.stream("Hi")
+            received = []
+            for chunk in stream:
+                received.append(chunk)
+                handler.cancel_streams()
+
+        self.assertEqual(received, ["tok"])
+        time.sleep(0.1) # let the loop finish closing the generator
+        self.assertTrue(closed)
+
+    def test_abandoned_stream_stops_generating(self):
+        # A consumer that stops iterating early (break + close) cancels the backend stream
+        closed = []
+
+        async def endless(*args, **kwargs):
+            try:
+                while True:
+                    yield "tok"
+                    await asyncio.sleep(0.01)
+            finally:
+                closed.append(True)
+
+        handler = LLMHandler()
+        with patch.object(handler, 'astream', side_effect=endless):
+            chunks = iter(handler.stream("Hi"))
+            self.assertEqual(next(chunks), "tok")
+            chunks.close()
+
+        time.sleep(0.1)
+        self.assertTrue(closed)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from NOVA.core.memory_manager import MemoryManager
+
+class TestMemoryManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "memory.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_window_and_summary(self):
+        async def fake_summary(*args, **kwargs):
+            return "User asked about Rex the dog."
+
+        handler = MagicMock()
+        handler.agenerate.side_effect = fake_summary
+        with patch('NOVA.core.memory_manager.get_llm_handler', return_value=handler):
+            memory = MemoryManager(path=self.path)
+            memory.window_tokens = 30
+            for i in range(5):
+                memory.save_context(f"question {i} about my dog", f"answer {i} about Rex")
+            # Background summarization runs on the shared loop
+            deadline = time.time() + 2
+            while (memory.pending or memory._summarizing) and time.time() < deadline:
+                time.sleep(0.02)
+
+        self.assertLess(memory._window_size(), 31)
+        self.assertEqual(memory.summary, "User asked about Rex the dog.")
+        self.assertEqual(memory.pending, [])
+        self.assertEqual(handler.agenerate.call_args[1]["task"], "summarize")
+
+        context = memory.build_context(budget_tokens=1000)
+        self.assertTrue(context.startswith("Earlier: User asked about Rex"))
+        self.assertTrue(context.endswith("NOVA: answer 4 about Rex"))
+        # Tight budget keeps only the newest turn
+        self.assertEqual(memory.build_context(budget_tokens=15), "User: question 4 about my dog\nNOVA: answer 4 about Rex")
+
+        # Persisted across restarts
+        reloaded = MemoryManager(path=self.path)
+        self.assertEqual(reloaded.summary, memory.summary)
+        self.assertEqual(reloaded.turns, memory.turns)
+
+    def test_summary_keeps_turns_trimmed_in_meantime(self):
+        memory = MemoryManager(path=self.path)
+        memory.max_pending = 2
+        memory.pending = [{"user": "q0", "assistant": "a0"}, {"user": "q1", "assistant": "a1"}]
+        prompts = []
+
+        async def summarize(prompt, **kwargs):
+            prompts.append(prompt)
+            if len(prompts) == 1:
+                # Two more turns overflow while the LLM call runs; the trim drops q0 and q1
+                with memory._lock:
+                    memory.pending.extend([{"user": "q2", "assistant": "a2"}, {"user": "q3", "assistant": "a3"}])
+                    del memory.pending[:len(memory.pending) - memory.max_pending]
+            return f"Summary {len(prompts)}."
+
+        handler = MagicMock()
+        handler.agenerate.side_effect = summarize
+        with patch('NOVA.core.memory_manager.get_llm_handler', return_value=handler):
+            asyncio.run(memory._asummarize())
+
+        # q2 and q3 weren't in the first batch, so they get their own pass instead of being lost
+        self.assertEqual(len(prompts), 2)
+        self.assertIn("User: q3", prompts[1])
+        self.assertEqual(memory.pending, [])
+        self.assertEqual(memory.summary, "Summary 2.")
+
+    def test_context_since(self):
+        memory = MemoryManager(path=self.path)
+        memory.summary = "User has a dog."
+        memory.turns = [{"user": "old question", "assistant": "old answer", "ts": 100.0},
+                        {"user": "new question", "assistant": "new answer", "ts": 200.0}]
+        self.assertTrue(memory.build_context(1000).startswith("Earlier: User has a dog."))
+        self.assertEqual(memory.build_context(1000, since=150.0), "User: new question\nNOVA: new answer")
+        self.assertEqual(memory.build_context(1000, since=300.0), "")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from unittest.mock import MagicMock
+from NOVA.core.mood import MoodDetector
+
+class TestMoodDetector(unittest.TestCase):
+    def setUp(self):
+        self.llm = MagicMock()
+        self.detector = MoodDetector()
+        self.detector.prototypes = {} # lexicon + LLM only, no embedding model download
+        self.detector._llm = self.llm
+
+    def test_lexicon_first(self):
+        labels = self.detector.analyze_batch(["I love this, thanks", "this is not good", "I'm so upset"])
+        self.assertEqual(labels, ["positive", "negative", "negative"])
+        self.llm.generate_json.assert_not_called()
+
+    def test_low_confidence_escalates_in_one_call(self):
+        self.llm.generate_json.return_value = {"labels": ["neutral", "positive"]}
+        texts = ["open the door", "the pizza arrived", "I'm happy", "open the door"]
+
+        self.assertEqual(self.detector.analyze_batch(texts), ["neutral", "positive", "positive", "neutral"])
+        self.assertEqual(self.llm.generate_json.call_count, 1)
+        prompt = self.llm.generate_json.call_args[0][0]
+        self.assertIn("1. open the door\n2. the pizza arrived", prompt)
+        self.assertEqual(self.llm.generate_json.call_args[1]["task"], "classify")
+
+        # Served from the cache afterwards
+        self.assertEqual(self.detector.analyze("The pizza arrived!"), "positive")
+        self.assertEqual(self.llm.generate_json.call_count, 1)
+
+    def test_llm_failure_keeps_local_label(self):
+        self.llm.generate_json.side_effect = ValueError("bad output")
+        self.assertEqual(self.detector.analyze("the pizza arrived"), "neutral")
+        self.assertEqual(self.detector.analyze_batch(["whatever"], escalate=False), ["neutral"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import patch
+from NOVA.core.nlp import NLPHandler
+from NOVA.features.app_control import AppControlSkill
+
+INSTALLED = {"spotify", "calculator", "google chrome", "safari"}
+
+class TestNLPHandler(unittest.TestCase):
+    def setUp(self):
+        self.nlp = NLPHandler()
+
+    def test_list_order_wins_over_position(self):
+        # "hi" comes first in the text, but get_time is listed before greet
+        self.assertEqual(self.nlp.process("Hi, what time is it?"), ("get_time", {}, 1.0))
+
+    def test_entities_and_fillers(self):
+        self.assertEqual(self.nlp.process("Um, could you play despacito on youtube please"),
+                         ("play_youtube", {"query": "despacito"}, 1.0))
+        # Both weather patterns name their group "location"
+        self.assertEqual(self.nlp.process("weather for Paris")[1], {"location": "paris"})
+        self.assertEqual(self.nlp.process("weather in Dallas")[1], {"location": "dallas"})
+        self.assertEqual(self.nlp.process("open the pod bay doors"), ("unknown", {}, 0.0))
+
+    def test_recompile_after_adding_patterns(self):
+        self.nlp.patterns.insert(0, (r"remind me to (?P<task>.*)", "set_reminder", "task"))
+        self.nlp.compile()
+        self.assertEqual(self.nlp.process("remind me to feed Rex"), ("set_reminder", {"task": "feed rex"}, 1.0))
+
+    def test_skill_patterns_behind_keywords(self):
+        with patch('NOVA.features.app_control.installed_apps', return_value=INSTALLED):
+            skill = AppControlSkill()
+        self.nlp.register_patterns(skill.name, skill.patterns, skill.trigger_keywords)
+        self.nlp.register_patterns("Timer", [(r"^set a timer for (?P<time>\d+ minutes)$", "set_alarm")], ["timer"])
+        self.nlp.compile()
+
+        self.assertEqual(self.nlp.process("Could you open Spotify, please."), ("open_app", {"app_name": "spotify"}, 1.0))
+        self.assertEqual(self.nlp.process("quit the calculator app"),
+                         ("close_app", {"action": "quit", "app_name": "calculator"}, 1.0))
+        self.assertEqual(self.nlp.process("set a timer for 10 minutes"), ("set_alarm", {"time": "10 minutes"}, 1.0))
+        # Websites and longer requests fall through to the built-ins / routers
+        self.assertEqual(self.nlp.process("open youtube")[0], "unknown")
+        self.assertEqual(self.nlp.process("open google and search for cats")[0], "google_search")
+
+    def test_app_patterns_only_claim_installed_apps(self):
+        with patch('NOVA.features.app_control.installed_apps', return_value=INSTALLED):
+            skill = AppControlSkill()
+        self.nlp.register_patterns(skill.name, skill.patterns, skill.trigger_keywords)
+        self.nlp.compile()
+
+        self.assertEqual(self.nlp.process("can you open spotify for me"), ("open_app", {"app_name": "spotify"}, 1.0))
+        self.assertEqual(self.nlp.process("open google chrome")[1], {"app_name": "google chrome"})
+        for text in ("open a new tab", "open the pod bay doors", "close the door", "open up a browser",
+                     "open my spotify playlist"):
+            self.assertNotIn(self.nlp.process(text)[0], ("open_app", "close_app"), text)
+
+    def test_no_app_patterns_without_installed_apps(self):
+        with patch('NOVA.features.app_control.installed_apps', return_value=set()):
+            self.assertEqual(AppControlSkill().patterns, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from unittest.mock import patch
+from NOVA.core.fact_index import FactIndex, np
+from NOVA.core.profile import profile_manager
+
+VOCAB = ["python", "coffee", "dog", "dallas", "guitar"]
+
+def bag_of_words(texts):
+    # Tiny deterministic embedding: one dimension per vocabulary word
+    return [[float(w in t.lower()) + 0.01 for w in VOCAB] for t in texts]
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestProfileFacts(unittest.TestCase):
+    def setUp(self):
+        self.data = {"name": "Eric", "preferences": {}, "facts": [
+            "I write Python at work", "I drink coffee black", "My dog is named Rex",
+            "I live in Dallas", "I play guitar"
+        ]}
+        self.patches = [
+            patch.object(profile_manager, "data", self.data),
+            patch.object(profile_manager, "fact_index", FactIndex(embed_fn=bag_of_words)),
+            patch.object(profile_manager, "save")
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+
+    def test_selects_relevant_facts(self):
+        facts = profile_manager.select_facts("what should I name my new dog", top_k=2)
+        self.assertEqual(facts[0], "My dog is named Rex")
+        self.assertEqual(len(facts), 2)
+
+    def test_budget_caps_context(self):
+        facts = profile_manager.select_facts("guitar", top_k=5, budget_tokens=5)
+        self.assertEqual(facts, ["I play guitar"])
+
+    def test_add_fact_merges_near_duplicates(self):
+        profile_manager.add_fact("i live in dallas.")
+        profile_manager.add_fact("I moved to Dallas")
+        self.assertEqual(len(self.data["facts"]), 5)
+        self.assertIn("I moved to Dallas", self.data["facts"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import patch
+from NOVA.core.semantic_cache import SemanticCache, np
+
+# Fixed vectors so similarity is known up front
+VECTORS = {
+    "who are you": [1.0, 0.0, 0.0],
+    "what are you": [0.95, 0.31, 0.0], # cos ~0.95
+    "tell me a joke": [0.0, 1.0, 0.0],
+    "what is the news today": [0.0, 0.0, 1.0]
+}
+
+def embed(texts):
+    return [VECTORS[t] for t in texts]
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestSemanticCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = SemanticCache(embed_fn=embed, threshold=0.9, ttl=60)
+        self.cache.enabled = True
+
+    def test_threshold_hit_and_miss(self):
+        self.assertEqual("".join(self.cache.remember_stream("who are you", iter(["I am ", "NOVA."]))), "I am NOVA.")
+        answer, score = self.cache.lookup("what are you")
+        self.assertEqual(answer, "I am NOVA.")
+        self.assertGreater(score, 0.9)
+        self.assertIsNone(self.cache.lookup("tell me a joke"))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_volatile_and_error_answers_not_stored(self):
+        self.cache.add("what is the news today", "Nothing new.")
+        self.cache.add("who are you", "Error: 500")
+        self.assertEqual(self.cache._entries, [])
+        self.assertIsNone(self.cache.lookup("what is the news today"))
+
+    def test_turns_with_history_skip_cache(self):
+        # "tell me more" depends on the conversation, so neither served from nor stored in the cache
+        self.cache.add("who are you", "I am NOVA.")
+        self.assertIsNone(self.cache.lookup("who are you", context="User: who is Bob?"))
+        self.cache.add("what are you", "Bob's assistant.", context="User: who is Bob?")
+        self.assertEqual(len(self.cache._entries), 1)
+
+    def test_expired_entries_evicted(self):
+        with patch('NOVA.core.semantic_cache.time.time', return_value=1000.0):
+            self.cache.add("who are you", "I am NOVA.")
+        with patch('NOVA.core.semantic_cache.time.time', return_value=1000.0 + 61):
+            self.assertIsNone(self.cache.lookup("who are you"))
+        self.assertEqual(self.cache._entries, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import shutil
+import tempfile
+import unittest
+
+try:
+    from NOVA.core.semantic_router import SemanticRouter, np
+except ImportError:
+    SemanticRouter = np = None
+
+VOCAB = ["weather", "rain", "alarm", "remind", "search", "google", "music", "play"]
+
+def bag_of_words(texts):
+    # Tiny deterministic embedding: one dimension per vocabulary word
+    return [[float(w in t.lower()) + 0.01 for w in VOCAB] for t in texts]
+
+@unittest.skipIf(SemanticRouter is None or np is None, "chromadb/numpy not installed")
+class TestSemanticRouter(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.router = SemanticRouter(persistence_path=self.path, embed_fn=bag_of_words)
+        self.router.register_intent("get_weather", "Weather and rain forecast")
+        self.router.register_intent("set_alarm", "Set an alarm", examples=["remind me later", "wake me with an alarm"])
+        self.router.register_intent("google_search", "Search google")
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def test_rank_from_memory(self):
+        ranked = self.router.rank("will it rain, check the weather", 2)
+        self.assertEqual(ranked[0][0], "get_weather")
+        self.assertEqual(len(ranked), 2)
+        # Examples count toward their intent; each intent appears once
+        self.assertEqual(self.router.route("remind me")[0], "set_alarm")
+        self.assertEqual(len(self.router.rank("alarm", 5)), 3)
+
+        # The lookup never goes through Chroma's query path
+        self.router.collection.query = None
+        self.router._last_rank = None
+        self.assertEqual(self.router.route("search google")[0], "google_search")
+
+    def test_index_reloads_from_persistence(self):
+        reloaded = SemanticRouter(persistence_path=self.path, embed_fn=bag_of_words)
+        expected = self.router.rank("weather", 3)
+        actual = reloaded.rank("weather", 3)
+        self.assertEqual([name for name, _ in actual], [name for name, _ in expected])
+        self.assertAlmostEqual(actual[0][1], expected[0][1], places=5)
+
+    def test_sync_embeds_only_changes(self):
+        calls = []
+        def counting_embed(texts):
+            calls.append(list(texts))
+            return bag_of_words(texts)
+
+        router = SemanticRouter(persistence_path=self.path, embed_fn=counting_embed, model_name="bag_of_words_v2")
+        entries = [("get_weather", "Weather and rain forecast", None),
+                   ("set_alarm", "Set an alarm", ["remind me later", "wake me with an alarm"]),
+                   ("google_search", "Search google", None)]
+        # Same content, but a different model name than setUp's router: everything is re-embedded once
+        self.assertEqual(router.register_intents(entries), 3)
+        self.assertEqual(len(calls), 1) # one batch
+        self.assertEqual(router.register_intents(entries), 0)
+
+        # A restart reads the hashes back from the store
+        calls.clear()
+        restarted = SemanticRouter(persistence_path=self.path, embed_fn=counting_embed, model_name="bag_of_words_v2")
+        entries[1] = ("set_alarm", "Set an alarm", ["remind me later"])
+        del entries[2]
+        self.assertEqual(restarted.register_intents(entries), 1)
+        self.assertEqual(calls, [["Set an alarm", "remind me later"]])
+        # Orphaned intent and the dropped example are gone from the store and the index
+        self.assertEqual(sorted(restarted.collection.get()["ids"]),
+                         ["get_weather_desc", "set_alarm_desc", "set_alarm_ex_0"])
+        self.assertEqual(len(restarted.rank("search google", 5)), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from NOVA.core.base_skill import BaseSkill
+from NOVA.core.types import SkillResponse, ToolTurn
+from NOVA.core.skill_manager import SkillManager
+from NOVA.core.semantic_cache import SemanticCache
+from NOVA.core.memory_manager import MemoryManager
+from NOVA.core.json_schema import strict_compatible, validate
+
+class WeatherSkill(BaseSkill):
+    def __init__(self):
+        super().__init__()
+        self.name = "WeatherSkill"
+        self.intents = ["get_weather"]
+        self.slots = {"location": "City name"}
+        self.calls = []
+
+    def execute(self, entities):
+        self.calls.append(entities)
+        return SkillResponse(text="Sunny, 25C")
+
+class FakeStream:
+    # Stands in for CancellableStream; records how much of the reply was generated
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.sent = []
+        self.cancelled = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            if self.cancelled:
+                return
+            self.sent.append(chunk)
+            yield chunk
+
+    def cancel(self):
+        self.cancelled = True
+
+class TestSkillManagerRouting(unittest.TestCase):
+    def setUp(self):
+        # No features package, vector store or real LLM
+        with patch('NOVA.core.skill_manager.get_llm_handler'), \
+             patch('NOVA.core.skill_manager.SemanticRouter', None):
+            self.manager = SkillManager("no_such_features_pkg")
+        self.llm = self.manager.llm = MagicMock()
+        self.skill = WeatherSkill()
+        self.manager.skills = {"get_weather": self.skill}
+        self.manager._build_catalogue()
+        self.manager.semantic_cache = MagicMock()
+        self.manager.semantic_cache.remember_stream.side_effect = lambda text, gen, context=None, cancelled=None: gen
+        memory = patch('NOVA.core.skill_manager.memory_manager')
+        self.memory = memory.start()
+        self.memory.build_context.return_value = ""
+        self.addCleanup(memory.stop)
+
+    def test_json_router_dispatches_tool_early(self):
+        router = FakeStream(['{"tool": "get_weather", ', '"args": {"location": ', '"Dallas"}, ',
+                             '"response": "Let me ', 'check that for you."}'])
+        self.llm.stream.side_effect = [router, iter(["It's sunny."])]
+
+        response, route = self.manager._route_llm_json("should I bring an umbrella in Dallas?")
+        self.assertEqual(route, "LLM-TOOL[get_weather]")
+        self.assertEqual(self.skill.calls, [{"location": "Dallas"}])
+        # Router generation stops once tool + args are known
+        self.assertTrue(router.cancelled)
+        self.assertEqual(len(router.sent), 3)
+        self.assertEqual("".join(response.iterator), "It's sunny.")
+        self.assertEqual(self.llm.stream.call_args[1]["task"], "synthesize")
+
+    def test_router_schema_is_strict(self):
+        schema = self.manager._router_schema(["get_weather"])
+        self.assertTrue(strict_compatible(schema))
+        reply = {"tool": "get_weather", "args": {"location": None}, "response": "Checking."}
+        self.assertEqual(validate(reply, schema), [])
+        # Null slots (strict mode's "not given") are dropped before the skill runs
+        self.assertEqual(self.manager._checked_args(self.skill, reply["args"]), {})
+
+    def test_json_router_streams_chat_response(self):
+        router = FakeStream(['{"tool": null, "args": null, "response": "Hel', 'lo \\"there\\"', '"}'])
+        self.llm.stream.return_value = router
+
+        response, route = self.manager._route_llm_json("hi")
+        self.assertEqual(route, "LLM-CHAT")
+        self.assertEqual("".join(response.iterator), 'Hello "there"')
+        self.assertFalse(router.cancelled)
+        self.assertEqual(self.llm.stream.call_count, 1)
+
+    def test_router_reply_gets_persona_and_facts(self):
+        # The router's response is spoken on chat turns, so it needs the persona + profile
+        self.llm.stream.return_value = FakeStream(['{"tool": null, "args": null, "response": "You\'re Eric."}'])
+        with patch('NOVA.core.skill_manager.persona_manager') as persona:
+            response, _ = self.manager._route_llm_json("what's my name?")
+            self.assertEqual("".join(response.iterator), "You're Eric.")
+        persona.get_task_prompt.assert_called_with("route", "what's my name?")
+        self.assertEqual(self.llm.stream.call_args[1]["system_prompt"], persona.get_task_prompt.return_value)
+
+    def test_follow_up_chat_uses_history_but_not_cache(self):
+        self.memory.build_context.return_value = "User: who is Bob Dylan?\nNOVA: A songwriter."
+        self.llm.stream.side_effect = [FakeStream(['{"tool": null, "args": null, "response": ""}']),
+                                       iter(["He's 84."])]
+        with patch('NOVA.core.skill_manager.persona_manager') as persona:
+            response, _ = self.manager._route_llm_json("how old is he?")
+            self.assertEqual("".join(response.iterator), "He's 84.")
+        # Empty router reply: chat is generated with the history, facts picked for the utterance alone
+        prompt = self.llm.stream.call_args[0][0]
+        self.assertIn("who is Bob Dylan?", prompt)
+        persona.get_task_prompt.assert_called_with("chat", "how old is he?")
+        self.assertEqual(self.manager.semantic_cache.remember_stream.call_args[0][2],
+                         self.memory.build_context.return_value)
+
+    def test_stop_mid_answer_is_not_cached(self):
+        self.manager.semantic_cache = SemanticCache()
+        self.manager.semantic_cache.add = MagicMock()
+        router = FakeStream(['{"tool": null, "args": null, "response": "The capital', ' of France is Paris."}'])
+        self.llm.stream.return_value = router
+
+        response, _ = self.manager._route_llm_json("what's the capital of France?")
+        tokens = iter(response.iterator)
+        self.assertEqual(next(tokens), "The capital")
+        router.cancel() # STOP
+        self.assertEqual(list(tokens), [])
+        self.manager.semantic_cache.add.assert_not_called()
+
+    def test_stop_before_first_token_does_not_regenerate(self):
+        self.manager.semantic_cache = SemanticCache()
+        self.manager.semantic_cache.add = MagicMock()
+        router = FakeStream(['{"tool": null, "args": null, ', '"response": "Hi"}'])
+        self.llm.stream.return_value = router
+
+        response, _ = self.manager._route_llm_json("hello")
+        router.cancel() # STOP while waiting for the response field
+        self.assertEqual("".join(response.iterator), "")
+        self.assertEqual(self.llm.stream.call_count, 1)
+        self.manager.semantic_cache.add.assert_not_called()
+
+    def test_cache_used_after_a_past_session(self):
+        # Memory persists across restarts; only this session's turns make a question a follow-up
+        with tempfile.TemporaryDirectory() as tmp:
+            memory = MemoryManager(path=os.path.join(tmp, "memory.json"))
+        memory.summary = "User asked about music."
+        memory.turns = [{"user": "who is Bob Dylan?", "assistant": "A songwriter.", "ts": time.time() - 3600}]
+        self.manager.semantic_cache = SemanticCache()
+        self.manager.semantic_cache.add = MagicMock()
+        self.llm.stream.return_value = FakeStream(['{"tool": null, "args": null, "response": "I am NOVA."}'])
+
+        with patch('NOVA.core.skill_manager.memory_manager', memory):
+            response, _ = self.manager._route_llm_json("who are you?")
+            self.assertEqual("".join(response.iterator), "I am NOVA.")
+            self.manager.semantic_cache.add.assert_called_once_with("who are you?", "I am NOVA.", "")
+            # Router still sees the old conversation
+            self.assertIn("who is Bob Dylan?", self.llm.stream.call_args[0][0])
+
+            memory.turns.append({"user": "how old is he?", "assistant": "84.", "ts": time.time()})
+            self.assertEqual(self.manager._cache_context(), "User: how old is he?\nNOVA: 84.")
+
+    def test_json_router_plain_text_reply(self):
+        # Model ignored the JSON format: its text is the answer, no second call
+        self.llm.stream.return_value = FakeStream(["I'm fine, ", "thanks."])
+        response, route = self.manager._route_llm_json("how are you?")
+        self.assertEqual("".join(response.iterator), "I'm fine, thanks.")
+        self.assertEqual(self.llm.stream.call_count, 1)
+
+    def test_tool_call_after_text_still_runs(self):
+        turn = ToolTurn(backend="openai")
+        def text_then_tool():
+            yield "Let me check."
+            turn.tool_name, turn.tool_args = "get_weather", {"location": "Dallas"}
+        turn.iterator = text_then_tool()
+        self.llm.tool_turn.return_value = turn
+        self.llm.tool_result_stream.return_value = iter(["It's sunny in Dallas."])
+
+        response, route = self.manager._route_llm_tools("weather in Dallas?")
+        self.assertEqual(route, "LLM-CHAT")
+        self.assertEqual("".join(response.iterator), "Let me check. It's sunny in Dallas.")
+        self.assertEqual(self.skill.calls, [{"location": "Dallas"}])
+        # The preamble isn't a complete answer, so it's not cached
+        self.manager.semantic_cache.add.assert_not_called()
+
+    def test_stopped_tool_turn_chat_is_not_cached(self):
+        stream = FakeStream(["Paris is ", "the capital."])
+        turn = ToolTurn(backend="openai", stream=stream)
+        turn.iterator = (chunk for chunk in stream)
+        self.llm.tool_turn.return_value = turn
+
+        response, _ = self.manager._route_llm_tools("what's the capital of France?")
+        tokens = iter(response.iterator)
+        self.assertEqual(next(tokens), "Paris is ")
+        stream.cancel() # STOP
+        self.assertEqual(list(tokens), [])
+        self.manager.semantic_cache.add.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
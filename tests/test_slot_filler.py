@@ -0,0 +1,53 @@
+import unittest
+from types import SimpleNamespace
+from NOVA.core.slot_filler import slot_filler
+
+def skill(*slots, **types):
+    return SimpleNamespace(name="TestSkill", slots={s: "" for s in slots}, slot_types=types)
+
+class TestSlotFiller(unittest.TestCase):
+    def test_reminder_time_and_message(self):
+        entities = slot_filler.fill("Remind me to call mom in 10 minutes", skill("time", "message"))
+        self.assertEqual(entities["time"], "10 minutes")
+        self.assertEqual(entities["message"], "call mom")
+        self.assertEqual(entities["raw_text"], "Remind me to call mom in 10 minutes")
+
+        entities = slot_filler.fill("remind me in half an hour to stretch", skill("time", "message"))
+        self.assertEqual((entities["time"], entities["message"]), ("30 minutes", "stretch"))
+        # Clock times come out in the HH:MM form SchedulerSkill parses
+        self.assertEqual(slot_filler.fill("set an alarm for 5:30 pm", skill("time"))["time"], "17:30")
+        self.assertNotIn("message", slot_filler.fill("wake me up at 7am", skill("time", "message")))
+
+        # "to" inside "tomorrow" isn't the message's "to"; the day word itself is dropped too
+        entities = slot_filler.fill("remind me tomorrow at 9am to call mom", skill("time", "message"))
+        self.assertEqual((entities["time"], entities["message"]), ("09:00", "call mom"))
+        # Compound durations add up in the smallest unit
+        self.assertEqual(slot_filler.fill("remind me in 1 hour 30 minutes", skill("time"))["time"], "90 minutes")
+        self.assertEqual(slot_filler.fill("timer for 2 minutes and 10 seconds", skill("time"))["time"], "130 seconds")
+
+    def test_typed_slots(self):
+        self.assertEqual(slot_filler.fill("what's it like in New York today?", skill("location"))["location"], "New York")
+        self.assertNotIn("location", slot_filler.fill("will it rain in 10 minutes", skill("location")))
+        # Times and non-places after in/for/at leave the slot empty (WeatherSkill uses the current location)
+        for text in ("forecast for the weekend", "weather for today", "how cold is it at night",
+                     "what's the weather at work", "what's the weather for the next few days",
+                     "what's the weather like in the city", "is it sunny here this week"):
+            self.assertNotIn("location", slot_filler.fill(text, skill("location")), text)
+        self.assertEqual(slot_filler.fill("weather in Paris at night", skill("location"))["location"], "Paris")
+        self.assertEqual(slot_filler.fill("weather in Paris for the next few days", skill("location"))["location"],
+                         "Paris")
+        self.assertEqual(slot_filler.fill("can you open spotify for me", skill("app_name"))["app_name"], "spotify")
+        self.assertEqual(slot_filler.fill("quit Safari please", skill("app_name", "location")),
+                         {"raw_text": "quit Safari please", "app_name": "Safari"})
+        self.assertEqual(slot_filler.fill("could you launch the Visual Studio Code app", skill("action", "app_name")),
+                         {"raw_text": "could you launch the Visual Studio Code app", "action": "open",
+                          "app_name": "Visual Studio Code"})
+        self.assertEqual(slot_filler.fill("turn logging up to debug", skill("level"))["level"], "DEBUG")
+        self.assertEqual(slot_filler.fill("search the web for best pizza in Dallas", skill("query"))["query"],
+                         "best pizza in Dallas")
+        # slot_types overrides the name-based guess; unknown slots stay empty
+        self.assertEqual(slot_filler.fill("play jazz on youtube", skill("topic", topic="query"))["topic"], "jazz")
+        self.assertEqual(slot_filler.fill("make it so", skill("steps")), {"raw_text": "make it so"})
+
+if __name__ == '__main__':
+    unittest.main()